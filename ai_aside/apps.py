@@ -50,3 +50,10 @@ class AiAsideConfig(AppConfig):
             }
         }
     }
+
+    def ready(self):
+        """
+        Connect the signal handlers.
+        """
+        from ai_aside.signals import connect_signals  # pylint: disable=import-outside-toplevel
+        connect_signals()
@@ -2,23 +2,43 @@
 
 import logging
 from datetime import datetime
+from functools import cached_property, lru_cache, partial
 
 import pytz
 from django.conf import settings
 from django.template import Context, Template
+from edx_django_utils.cache import get_cache_key
 from web_fragments.fragment import Fragment
 from webob import Response
 from xblock.core import XBlock, XBlockAside
 
 from ai_aside.config_api.api import is_summary_enabled
 from ai_aside.constants import ATTR_KEY_USER_ID, ATTR_KEY_USER_ROLE
+from ai_aside.content_cache import (
+    CONTENT_EXTRACTION_VERSION,
+    content_hash,
+    get_cached_child_contents,
+    get_cached_transcript,
+    is_known_not_summarizable,
+    lookup_transcript,
+    remember_not_summarizable,
+    store_transcript,
+    transcript_key,
+)
+from ai_aside.instrumentation import timed
 from ai_aside.platform_imports import get_block, get_text_transcript
+from ai_aside.streaming import encoded_etag, negotiate_encoding, streamed_json_response
+from ai_aside.summary_index import get_unit_index
 from ai_aside.text_utils import html_to_text
+from ai_aside.thread_pool import PooledTask, get_child_content_pool
 from ai_aside.waffle import summaries_configuration_enabled as ff_is_summary_config_enabled
 from ai_aside.waffle import summary_staff_only as ff_summary_staff_only
 
 log = logging.getLogger(__name__)
 
+# bump when the summary_handler response changes for the same unit, so cached responses are not reused
+SUMMARY_HANDLER_VERSION = 2
+
 # map block types to what ai-spot expects for content types
 CATEGORY_TYPE_MAP = {
     "html": "TEXT",
@@ -68,9 +88,64 @@ def _staff_user(block):
     return getattr(block.runtime, 'user_is_staff', False)
 
 
+@lru_cache(maxsize=1)
+def _summary_template():
+    """
+    Compile the summary hook template once per process.
+    """
+    return Template(summary_fragment)
+
+
 def _render_summary(context):
-    template = Template(summary_fragment)
-    return template.render(Context(context))
+    with timed('render'):
+        return _summary_template().render(Context(context))
+
+
+class _UnitChild:
+    """
+    A unit child and its metadata, fetching the child HTML at most once per render.
+    """
+
+    def __init__(self, block):
+        self.block = block
+        self.category = getattr(block, 'category', None)
+        self.published_on = getattr(block, 'published_on', None)
+        self.edited_on = getattr(block, 'edited_on', None)
+        self.definition_id = str(getattr(getattr(block, 'scope_ids', None), 'def_id', None))
+
+    @property
+    def content_type(self):
+        """The ai-spot content type of the child, None if it is not summarizable."""
+        return CATEGORY_TYPE_MAP.get(self.category)
+
+    @cached_property
+    def html(self):
+        """The raw HTML of the child."""
+        with timed('child_fetch'):
+            return self.block.get_html()
+
+    def dates_item(self):
+        """Describe the child without its contents."""
+        return {
+            'definition_id': self.definition_id,
+            'content_type': self.content_type,
+            'published_on': self.published_on,
+            'edited_on': self.edited_on,
+        }
+
+
+def _get_unit_children(block):
+    """
+    Fetch the children of a unit once, for both the summarizable check and extraction.
+    """
+    with timed('child_fetch'):
+        children = block.get_children()
+    return [_UnitChild(child) for child in children]
+
+
+def _fetch_transcript(child):
+    with timed('transcript'):
+        return get_text_transcript(child)
 
 
 def _extract_child_contents(child, category):
@@ -80,68 +155,167 @@ def _extract_child_contents(child, category):
     Returns a string or None if there are no contents available.
     """
     if category == 'html':
-        content_html = child.get_html()
-        text = html_to_text(content_html)
+        with timed('child_fetch'):
+            content_html = child.get_html()
+        with timed('html_to_text'):
+            text = html_to_text(content_html)
 
         return text
 
     if category == 'video':
-        transcript = get_text_transcript(child)  # may be None
+        transcript, _ = get_cached_transcript(child, partial(_fetch_transcript, child))  # may be None
         return transcript
 
     return None
 
 
-def _parse_children_contents(block):
+def _extract_unit_child_contents(child):
+    """
+    Process the contents of a fetched unit child, reusing its HTML.
+    """
+    if child.category == 'html':
+        html = child.html
+        with timed('html_to_text'):
+            return html_to_text(html)
+
+    return _extract_child_contents(child.block, child.category)
+
+
+def _get_cached_unit_child_contents(child):
+    """
+    Get the contents of a fetched unit child and their hash, extracting them only on a cache miss.
+
+    Video transcripts can change without the video being edited, so they are
+    only cached by what the platform finds them by, not with the other contents.
+    Children that are not summarizable have no contents, and skip the caches.
+    """
+    if child.content_type is None:
+        return None, None
+
+    if child.category == 'video':
+        return get_cached_transcript(child.block, partial(_fetch_transcript, child.block))
+
+    return get_cached_child_contents(child.block, partial(_extract_unit_child_contents, child))
+
+
+def _submit_children_contents(children):
+    """
+    Start extracting the transcripts of uncached video children on the thread pool.
+
+    HTML children are cheap to convert and stay in the request thread, and
+    so do the cache lookups. Nothing is submitted if the pool is disabled.
+
+    Returns a dictionary from child index to its cached text and hash or pooled task.
     """
-    Extract the analyzable contents from block children.
+    pool = get_child_content_pool()
+    if pool is None:
+        return {}
+
+    prefetched = {}
+    for index, child in enumerate(children):
+        if child.category != 'video':
+            continue
+
+        found, text, text_hash = lookup_transcript(child.block)
+        if found:
+            prefetched[index] = (text, text_hash)
+        else:
+            # not timed on the pool, where the request's instrumentation state is not
+            prefetched[index] = PooledTask(pool, partial(get_text_transcript, child.block))
+
+    return prefetched
+
+
+def _prefetched_child_contents(child, prefetched):
+    """
+    Get the contents of a child and their hash from _submit_children_contents, None if its extraction timed out.
+    """
+    if not isinstance(prefetched, PooledTask):
+        return prefetched
+
+    with timed('transcript'):
+        finished, text = prefetched.result()
+    if not finished:
+        log.warning(f'Summary hook timed out extracting the contents of {child.definition_id}')
+        return None, None
+
+    return text, store_transcript(child.block, text)
+
+
+def _parse_children_contents(block, min_length=None, children=None):
+    """
+    Extract the analyzable contents from block children, fetching them unless given.
+
+    When min_length is given extraction stops as soon as the content is long
+    enough, and the remaining children are only listed with their dates,
+    which is all the summary hook needs from them.
+
+    Otherwise, if SUMMARY_CHILD_CONTENT_WORKERS is set, transcripts are
+    extracted concurrently, each within SUMMARY_CHILD_CONTENT_TIMEOUT seconds.
 
     Returns length and an item list.
     """
-    if not _check_summarizable(block):
+    if children is None:
+        children = _get_unit_children(block)
+
+    if not _check_summarizable(children):
         return 0, []
 
+    prefetched = _submit_children_contents(children) if min_length is None else {}
+
     content_items = []
 
-    children = block.get_children()
     content_length = 0
-    for child in children:
-        category = getattr(child, 'category', None)
-        category_type = CATEGORY_TYPE_MAP.get(category)
-        published_on = getattr(child, 'published_on', None)
-        edited_on = getattr(child, 'edited_on', None)
-        definition_id = str(getattr(getattr(child, 'scope_ids', None), 'def_id', None))
-        text = _extract_child_contents(child, category)
+    for index, child in enumerate(children):
+        if min_length is not None and content_length >= min_length:
+            if child.content_type is not None:
+                content_items.append(child.dates_item())
+            continue
+
+        if index in prefetched:
+            text, text_hash = _prefetched_child_contents(child, prefetched[index])
+        else:
+            text, text_hash = _get_cached_unit_child_contents(child)
 
         if text is None:
             continue
 
         content_length += len(text)
-        content_items.append({
-            'definition_id': definition_id,
-            'content_type': category_type,
-            'content_text': text,
-            'published_on': published_on,
-            'edited_on': edited_on,
-        })
+        content_items.append({**child.dates_item(), 'content_text': text, 'content_hash': text_hash})
 
     return content_length, content_items
 
 
-def _check_summarizable(block):
+def _peek_children_contents(block, children=None):
     """
-    First pass check if a block has or does not have sufficient text to summarize.
+    Decide whether a unit is summarizable from cheap metadata only, fetching its children unless given.
 
-    We don't sanitize the content due to performance in this first check.
+    Relies on the raw HTML size check, without cleaning the HTML or fetching
+    transcripts, and lists the summarizable children with their dates only.
+
+    Returns whether the unit is summarizable and an item list.
     """
-    children = block.get_children()
+    if children is None:
+        children = _get_unit_children(block)
+
+    if not _check_summarizable(children):
+        return False, []
+
+    return True, [child.dates_item() for child in children if child.content_type is not None]
 
+
+def _check_summarizable(children):
+    """
+    First pass check if the fetched unit children have or do not have sufficient text to summarize.
+
+    We don't sanitize the content due to performance in this first check.
+    """
     content_length = 0
 
     for child in children:
         category = child.category
         if category == 'html':
-            content_length += len(child.get_html())
+            content_length += len(child.html)
             if content_length > settings.SUMMARY_HOOK_MIN_SIZE:
                 return True
 
@@ -162,27 +336,146 @@ def _latest_block_date(maybe_dates):
     return latest
 
 
-def _render_hook_fragment(user_role_string, handler_url, block, summary_items):
+def _last_updated(block, summary_items):
+    """
+    Find the last time anything happened to a block or its summarized children.
+    """
+    all_interesting_dates = [getattr(block, 'published_on', None), getattr(block, 'edited_on', None)]
+    for item in summary_items:
+        all_interesting_dates.append(item['published_on'])
+        all_interesting_dates.append(item['edited_on'])
+
+    return _latest_block_date(all_interesting_dates)
+
+
+def children_signature(block, children=None):
+    """
+    Summarize the definitions and edit dates of the children of a unit, which change with its contents.
+
+    Video children also contribute what the platform finds their transcript by.
+    The children are fetched unless given.
+    """
+    if children is None:
+        children = _get_unit_children(block)
+
+    return get_cache_key(children=[
+        (child.definition_id, child.edited_on, transcript_key(child.block) if child.category == 'video' else None)
+        for child in children
+    ])
+
+
+def _has_video_children(children):
+    """
+    Check whether some of the fetched unit children are videos, whose transcripts may arrive at any time.
+    """
+    return any(child.category == 'video' for child in children)
+
+
+def _summary_etag(block, children):
+    """
+    Compute the ETag of the summary_handler response of a unit, without extracting its children.
+
+    It covers the dates of the unit, the definitions and dates of its children,
+    the hashes of the cached video transcripts, and the settings and version
+    of the extraction.
+    A transcript can be uploaded or replaced without any of these blocks being
+    edited, so there is no ETag, None, unless every video has a cached transcript.
+    """
+    transcript_hashes = []
+    for child in children:
+        text_hash = None
+        if child.category == 'video':
+            _, text, text_hash = lookup_transcript(child.block)
+            if text is None:
+                return None
+        transcript_hashes.append(text_hash)
+
+    return get_cache_key(
+        version=SUMMARY_HANDLER_VERSION,
+        usage_id=str(block.scope_ids.usage_id),
+        published_on=getattr(block, 'published_on', None),
+        edited_on=getattr(block, 'edited_on', None),
+        children=[
+            (
+                child.definition_id,
+                child.published_on,
+                child.edited_on,
+                transcript_hash,
+            )
+            for child, transcript_hash in zip(children, transcript_hashes)
+        ],
+        min_size=settings.SUMMARY_HOOK_MIN_SIZE,
+        tags_to_remove=getattr(settings, 'HTML_TAGS_TO_REMOVE', None),
+        extraction_version=CONTENT_EXTRACTION_VERSION,
+    )
+
+
+def _unit_content_hash(items):
+    """
+    Hash the extracted contents of a unit, which only changes when the text of its items does.
+    """
+    return content_hash('\n'.join(f"{item['content_type']}:{item['content_hash']}" for item in items))
+
+
+def index_unit(block, children=None):
+    """
+    Compute the summary index entry of a unit, extracting its children like summary_handler.
+
+    The children are fetched unless given.
+
+    Returns: dictionary of the form:
+        `{'content_length': int, 'item_count': int, 'last_updated': datetime, 'children_signature': str}`
+    """
+    if children is None:
+        children = _get_unit_children(block)
+
+    content_length, items = _parse_children_contents(block, children=children)
+    return {
+        'content_length': content_length,
+        'item_count': len(items),
+        'last_updated': _last_updated(block, items),
+        'children_signature': children_signature(block, children),
+    }
+
+
+def _get_current_index(block):
+    """
+    Get the summary index entry of a unit, None if it is missing or the unit changed since.
+
+    The index is only consulted when SUMMARY_INDEX_ENABLED is set.
+    """
+    if not getattr(settings, 'SUMMARY_INDEX_ENABLED', False):
+        return None
+
+    usage_id = block.scope_ids.usage_id
+    entry = get_unit_index(usage_id.course_key, usage_id)
+    if entry is None or entry['last_updated'] is None:
+        return None
+
+    if _last_updated(block, []) > entry['last_updated']:
+        return None
+
+    return entry
+
+
+def _is_indexed_summarizable(entry):
+    return entry['item_count'] > 0 and entry['content_length'] >= settings.SUMMARY_HOOK_MIN_SIZE
+
+
+def _render_hook_fragment(user_role_string, handler_url, block, summary_items, last_updated=None):
     """
     Create hook Fragment from block and summarized children.
 
     Gathers data for the summary hook HTML, passes it into _render_summary
-    to get the HTML and packages that into a Fragment.
+    to get the HTML and packages that into a Fragment. The last update
+    date is found from the block and items unless it is given.
     """
-    last_published = getattr(block, 'published_on', None)
-    last_edited = getattr(block, 'edited_on', None)
     usage_id = block.scope_ids.usage_id
     course_key = usage_id.course_key
 
-    all_interesting_dates = [last_published, last_edited]
-    for item in summary_items:
-        published = item['published_on']
-        edited = item['edited_on']
-        all_interesting_dates.append(published)
-        all_interesting_dates.append(edited)
-
-    # we only need to know when the last time was that anything happened
-    last_updated = _latest_block_date(all_interesting_dates)
+    if last_updated is None:
+        # we only need to know when the last time was that anything happened
+        last_updated = _last_updated(block, summary_items)
 
     fragment = Fragment('')
     fragment.add_content(
@@ -216,6 +509,11 @@ class SummaryHookAside(XBlockAside):
 
         Only services and staff users are allowed to fetch summary text, everyone else
         gets an unhelpful 403.
+
+        Responses carry an ETag unless a video has no transcript, and a request
+        whose If-None-Match holds it gets a 304 without the children being
+        extracted. With SUMMARY_HANDLER_STREAMING set, the JSON is streamed
+        item by item, compressed if the client accepts it, with an ETag of its own.
         """
         if not _staff_user(self):
             return Response(status=403)
@@ -226,31 +524,50 @@ class SummaryHookAside(XBlockAside):
         if not valid:
             return Response(status=404)
 
+        streaming = getattr(settings, 'SUMMARY_HANDLER_STREAMING', False)
+        encoding = negotiate_encoding(request) if streaming else None
+
+        children = _get_unit_children(block)
+        etag = encoded_etag(_summary_etag(block, children), encoding)
+        if etag is not None and request is not None and etag in request.if_none_match:
+            response = Response(status=304)
+            response.etag = etag
+            return response
+
         published_on = getattr(block, 'published_on', None)
         edited_on = getattr(block, 'edited_on', None)
 
-        data = []
-
-        length, items = _parse_children_contents(block)
+        length, items = _parse_children_contents(block, children=children)
+        if etag is None:
+            # the transcripts found are cached now
+            etag = encoded_etag(_summary_etag(block, children), encoding)
 
         if length < settings.SUMMARY_HOOK_MIN_SIZE or len(items) < 1:
-            return Response(json_body={'data': []})
+            fields, items = {}, []
+        else:
+            fields = {
+                'content_id': str(block.scope_ids.usage_id),
+                'course_id': str(block.scope_ids.usage_id.course_key),
+                'content_hash': _unit_content_hash(items),
+                'published_on': _format_date(published_on),
+                'edited_on': _format_date(edited_on),
+            }
 
-        for item in items:
-            data.append({
+        data = (
+            {
                 **item,
                 'published_on': _format_date(item['published_on']),
                 'edited_on': _format_date(item['edited_on']),
-            })
-
-        json = {
-            'content_id': str(block.scope_ids.usage_id),
-            'course_id': str(block.scope_ids.usage_id.course_key),
-            'data': data,
-            'published_on': _format_date(published_on),
-            'edited_on': _format_date(edited_on),
-        }
-        return Response(json_body=json)
+            }
+            for item in items
+        )
+
+        if streaming:
+            response = streamed_json_response(request, fields, 'data', data, encoding=encoding)
+        else:
+            response = Response(json_body={**fields, 'data': list(data)})
+        response.etag = etag
+        return response
 
     @XBlockAside.aside_for('student_view')
     def student_view_aside(self, block, context=None):  # pylint: disable=unused-argument
@@ -277,12 +594,41 @@ class SummaryHookAside(XBlockAside):
 
         This function can throw exceptions.
         """
-        length, items = _parse_children_contents(block)
-
-        if length < settings.SUMMARY_HOOK_MIN_SIZE:
+        if is_known_not_summarizable(block):
             return Fragment('')
 
         usage_id = block.scope_ids.usage_id
+
+        children = None
+        index = _get_current_index(block)
+        if index is not None and _is_indexed_summarizable(index):
+            log.info(f'Summary hook injecting into {usage_id} from the summary index')
+            return _render_hook_fragment(
+                self._user_role_string(usage_id.course_key),
+                self._summary_handler_url(),
+                block,
+                [],
+                last_updated=index['last_updated'])
+
+        if index is not None:
+            # a video transcript may have arrived since, so those units are checked like unindexed ones
+            children = _get_unit_children(block)
+            if not _has_video_children(children):
+                return Fragment('')
+
+        if getattr(settings, 'SUMMARY_HOOK_LAZY', False):
+            # leave the full extraction to summary_handler, if ai-spot ever asks for it
+            summarizable, items = _peek_children_contents(block, children=children)
+        else:
+            length, items = _parse_children_contents(
+                block, min_length=settings.SUMMARY_HOOK_MIN_SIZE, children=children,
+            )
+            summarizable = length >= settings.SUMMARY_HOOK_MIN_SIZE
+
+        if not summarizable:
+            remember_not_summarizable(block)
+            return Fragment('')
+
         log.info(f'Summary hook injecting into {usage_id}')
 
         return _render_hook_fragment(
@@ -360,10 +706,18 @@ class SummaryHookAside(XBlockAside):
         course_key = block.scope_ids.usage_id.course_key
         unit_key = block.scope_ids.usage_id
 
-        if _staff_user(block) and ff_summary_staff_only(course_key):
-            return True
+        if _staff_user(block):
+            with timed('flags'):
+                staff_only = ff_summary_staff_only(course_key)
+            if staff_only:
+                return True
+
+        with timed('flags'):
+            config_enabled = ff_is_summary_config_enabled(course_key)
 
-        if ff_is_summary_config_enabled(course_key):
-            return is_summary_enabled(course_key, unit_key)
+        if config_enabled:
+            with timed('enablement'):
+                enabled = is_summary_enabled(course_key, unit_key)
+            return enabled
 
         return False
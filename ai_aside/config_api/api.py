@@ -2,12 +2,25 @@
 Implements an API for updating unit and course settings.
 """
 from django.conf import settings as django_settings
+from django.db import connections, transaction
 
+from ai_aside.config_api.cache import bump_course_version, get_course_snapshot
 from ai_aside.config_api.exceptions import AiAsideNotFoundException
-from ai_aside.config_api.internal import _get_course, _get_course_units, _get_unit
+from ai_aside.config_api.internal import _get_course, _get_course_enabled, _get_course_units, _get_unit
 from ai_aside.models import AIAsideCourseEnabled, AIAsideUnitEnabled
+from ai_aside.request_cache import request_cached
 from ai_aside.waffle import summaries_configuration_enabled
 
+REQUEST_CACHE_NAMESPACE = 'ai_aside.config_api'
+
+
+def _course_settings_changed(course_key):
+    """
+    Drop the cached settings of a course after writing to them.
+    """
+    bump_course_version(course_key)
+    _get_course_enablement.clear()
+
 
 def get_course_settings(course_key):
     """
@@ -40,10 +53,12 @@ def set_course_settings(course_key, settings):
 
     update = {'enabled': enabled}
 
-    return AIAsideCourseEnabled.objects.update_or_create(
+    result = AIAsideCourseEnabled.objects.update_or_create(
         course_key=course_key,
         defaults=update,
     )
+    _course_settings_changed(course_key)
+    return result
 
 
 def delete_course_settings(course_key):
@@ -55,6 +70,7 @@ def delete_course_settings(course_key):
     reset_course_unit_settings(course_key)
     record = _get_course(course_key)
     record.delete()
+    _course_settings_changed(course_key)
 
 
 def get_unit_settings(course_key, unit_key):
@@ -73,11 +89,41 @@ def get_unit_settings(course_key, unit_key):
     return fields
 
 
+def get_units_settings(course_key, offset=0, limit=None):
+    """
+    Gets the settings of the units of a course that have their own settings.
+
+    Units are listed in a stable order and can be paged through with offset
+    and limit, reading only the needed columns instead of model instances.
+
+    Returns: dictionary of the form:
+        `{'enabled': bool, 'count': int, 'units': [{'unit_id': str, 'enabled': bool}]}`
+    where `enabled` is the course default applying to every unit not listed.
+    """
+    enabled = _get_course_enabled(course_key)
+    if enabled is None:
+        enabled = django_settings.SUMMARY_ENABLED_BY_DEFAULT is True
+
+    units = _get_course_units(course_key).order_by('id').values_list('unit_key', 'enabled')
+    page = units[offset:] if limit is None else units[offset:offset + limit]
+
+    return {
+        'enabled': enabled,
+        'count': units.count(),
+        'units': [
+            {'unit_id': str(unit_key), 'enabled': unit_enabled}
+            for unit_key, unit_enabled in page.iterator()
+        ],
+    }
+
+
 def reset_course_unit_settings(course_key):
     """
     Deletes the unit settings of a course.
     """
-    return _get_course_units(course_key).delete()
+    result = _get_course_units(course_key).delete()
+    _course_settings_changed(course_key)
+    return result
 
 
 def set_unit_settings(course_key, unit_key, settings):
@@ -101,6 +147,42 @@ def set_unit_settings(course_key, unit_key, settings):
         unit_key=unit_key,
         defaults=settings,
     )
+    _course_settings_changed(course_key)
+
+
+def set_units_settings(course_key, units_settings):
+    """
+    Sets the settings of many units of a course at once.
+
+    Expects: units_settings as a dictionary mapping unit keys to settings of the form:
+        `{'enabled': bool}`
+
+    All units are upserted with a single bulk insert, in one transaction.
+    """
+    records = []
+    for unit_key, settings in units_settings.items():
+        enabled = settings['enabled']
+
+        if not isinstance(enabled, bool):
+            raise TypeError
+
+        records.append(AIAsideUnitEnabled(course_key=course_key, unit_key=unit_key, enabled=enabled))
+
+    database = AIAsideUnitEnabled.objects.db
+    # MySQL upserts on any unique index and refuses an explicit conflict target
+    if connections[database].features.supports_update_conflicts_with_target:
+        unique_fields = ['course_key', 'unit_key']
+    else:
+        unique_fields = None
+
+    with transaction.atomic(using=database):
+        AIAsideUnitEnabled.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=['enabled', 'modified'],
+        )
+    _course_settings_changed(course_key)
 
 
 def delete_unit_settings(course_key, unit_key):
@@ -111,6 +193,7 @@ def delete_unit_settings(course_key, unit_key):
     """
     record = _get_unit(course_key, unit_key)
     record.delete()
+    _course_settings_changed(course_key)
 
 
 def is_summary_config_enabled(course_key):
@@ -134,35 +217,68 @@ def is_course_settings_present(course_key):
         return False
 
 
-def is_summary_enabled(course_key, unit_key=None):
+def get_enabled_units(course_key, unit_keys=None):
     """
-    Gets the enabled state of a course's unit.
-    It considers both the state of a unit's override and a course defaults.
+    Gets the enabled state of many units of a course at once.
+
+    Resolves every unit with settings in the course, or only the given
+    unit keys, from the cached course snapshot. Building the snapshot takes
+    one query for the unit overrides and one for the course.
+
+    Returns: dictionary of the form:
+        `{'enabled': bool, 'units': {unit_key_string: bool}}`
+    where `enabled` applies to every unit missing from `units`.
     """
+    if unit_keys is None:
+        return _get_course_enablement(course_key)
+
+    return _resolve_enabled_units(course_key, unit_keys)
 
-    # If the feature flag is disabled, always returns False.
+
+@request_cached(REQUEST_CACHE_NAMESPACE)
+def _get_course_enablement(course_key):
+    """
+    Resolve the enabled state of all units of a course, memoized for the request.
+    """
+    return _resolve_enabled_units(course_key)
+
+
+def _resolve_enabled_units(course_key, unit_keys=None):
+    """
+    Resolve the enabled state of the units of a course.
+    """
+    # If the feature flag is disabled, everything is disabled.
     if not summaries_configuration_enabled(course_key):
-        return False
+        return {'enabled': False, 'units': {}}
 
-    enabled_by_default = django_settings.SUMMARY_ENABLED_BY_DEFAULT is True
+    snapshot = get_course_snapshot(course_key)
 
-    # Check unit-level override if unit_key provided
-    if unit_key is not None:
-        try:
-            unit = _get_unit(course_key, unit_key)
-            if unit is not None:
-                return unit.enabled
-        except AiAsideNotFoundException:
-            # No unit-level setting, fall through to check course-level
-            pass
+    enabled = snapshot['enabled']
+    if enabled is None:
+        enabled = django_settings.SUMMARY_ENABLED_BY_DEFAULT is True
 
-    # Check course-level setting
-    try:
-        course = _get_course(course_key)
-        if course is not None:
-            return course.enabled
-    except AiAsideNotFoundException:
-        # No course-level setting, use default
-        pass
+    units = snapshot['units']
+    if unit_keys is not None:
+        wanted = {str(unit_key) for unit_key in unit_keys}
+        units = {unit_key: value for unit_key, value in units.items() if unit_key in wanted}
+
+    return {
+        'enabled': enabled,
+        'units': units,
+    }
+
+
+def is_summary_enabled(course_key, unit_key=None):
+    """
+    Gets the enabled state of a course's unit.
+    It considers both the state of a unit's override and a course defaults.
+
+    The settings of the whole course are resolved once per request,
+    so checking every unit of a course does not query for each of them.
+    """
+    enablement = get_enabled_units(course_key)
+
+    if unit_key is None:
+        return enablement['enabled']
 
-    return enabled_by_default
+    return enablement['units'].get(str(unit_key), enablement['enabled'])
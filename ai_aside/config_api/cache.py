@@ -0,0 +1,176 @@
+"""
+Caches of the enablement settings of each course.
+
+A course snapshot holds the course setting and every unit override. It is
+stored in the Django cache along with the version of the course settings, and
+the API setters bump that version, so a snapshot is only used while nothing
+has been written to the course since it was built.
+
+In front of the Django cache each process keeps a small LRU of snapshots. A
+local snapshot is trusted for SUMMARY_ENABLEMENT_LOCAL_CACHE_TTL seconds, after
+which it is kept only if its version still matches the shared one, so other
+processes see a write at most that many seconds late.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from ai_aside.config_api.internal import _get_course_enabled, _get_units_enabled
+
+ENABLEMENT_CACHE_KEY_PREFIX = 'ai_aside.enablement'
+DEFAULT_ENABLEMENT_CACHE_TIMEOUT = 60 * 60 * 24
+DEFAULT_ENABLEMENT_LOCAL_CACHE_TTL = 10
+DEFAULT_ENABLEMENT_LOCAL_CACHE_MAX_ENTRIES = 1000
+
+
+class _LocalSnapshotCache:
+    """
+    A bounded LRU of course snapshots in this process, with the time each was last checked.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, course_key):
+        """Return a (snapshot, checked_at) tuple or None."""
+        with self._lock:
+            entry = self._entries.get(course_key)
+            if entry is not None:
+                self._entries.move_to_end(course_key)
+            return entry
+
+    def set(self, course_key, snapshot):
+        """Store a snapshot as checked now, evicting the least recently used ones."""
+        max_entries = getattr(
+            settings, 'SUMMARY_ENABLEMENT_LOCAL_CACHE_MAX_ENTRIES', DEFAULT_ENABLEMENT_LOCAL_CACHE_MAX_ENTRIES,
+        )
+        with self._lock:
+            self._entries[course_key] = (snapshot, time.monotonic())
+            self._entries.move_to_end(course_key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, course_key):
+        """Forget the snapshot of a course."""
+        with self._lock:
+            self._entries.pop(course_key, None)
+
+    def clear(self):
+        """Forget every snapshot."""
+        with self._lock:
+            self._entries.clear()
+
+
+_local_snapshots = _LocalSnapshotCache()
+
+
+def clear_local_cache():
+    """
+    Forget the snapshots kept in this process.
+    """
+    _local_snapshots.clear()
+
+
+def _version_key(course_key):
+    return f'{ENABLEMENT_CACHE_KEY_PREFIX}.{course_key}.version'
+
+
+def _snapshot_key(course_key):
+    return f'{ENABLEMENT_CACHE_KEY_PREFIX}.{course_key}.snapshot'
+
+
+def _new_version():
+    # versions start from the clock so an evicted counter cannot restart at a value already seen
+    return time.time_ns()
+
+
+def get_course_version(course_key):
+    """
+    Get the current version of the settings of a course.
+    """
+    version_key = _version_key(course_key)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, _new_version(), None)
+        version = cache.get(version_key)
+    return version
+
+
+def bump_course_version(course_key):
+    """
+    Invalidate the cached snapshot of a course after its settings changed.
+
+    The version is bumped right away and again when the transaction commits,
+    so a snapshot rebuilt from uncommitted data does not outlive it.
+    """
+    def bump():
+        try:
+            cache.incr(_version_key(course_key))
+        except ValueError:
+            cache.set(_version_key(course_key), _new_version(), None)
+
+    bump()
+    transaction.on_commit(bump)
+    _local_snapshots.delete(str(course_key))
+
+
+def _build_course_snapshot(course_key, version):
+    return {
+        'version': version,
+        'enabled': _get_course_enabled(course_key),
+        'units': _get_units_enabled(course_key),
+    }
+
+
+def get_course_snapshot(course_key):
+    """
+    Get the enablement settings of a course, from the caches if they are current.
+
+    Returns: dictionary of the form:
+        `{'version': int, 'enabled': bool or None, 'units': {unit_key_string: bool}}`
+    where `enabled` is None if the course has no settings.
+    """
+    ttl = getattr(settings, 'SUMMARY_ENABLEMENT_LOCAL_CACHE_TTL', DEFAULT_ENABLEMENT_LOCAL_CACHE_TTL)
+    if not ttl:
+        return _get_shared_course_snapshot(course_key)
+
+    local_key = str(course_key)
+    entry = _local_snapshots.get(local_key)
+    if entry is not None:
+        snapshot, checked_at = entry
+        if time.monotonic() - checked_at < ttl:
+            return snapshot
+        if cache.get(_version_key(course_key)) == snapshot['version']:
+            _local_snapshots.set(local_key, snapshot)
+            return snapshot
+
+    snapshot = _get_shared_course_snapshot(course_key)
+    _local_snapshots.set(local_key, snapshot)
+    return snapshot
+
+
+def _get_shared_course_snapshot(course_key):
+    """
+    Get the snapshot of a course from the Django cache, rebuilding it if it is outdated.
+    """
+    version_key = _version_key(course_key)
+    snapshot_key = _snapshot_key(course_key)
+
+    cached = cache.get_many([version_key, snapshot_key])
+    version = cached.get(version_key)
+    snapshot = cached.get(snapshot_key)
+
+    if version is None:
+        version = get_course_version(course_key)
+    elif snapshot is not None and snapshot['version'] == version:
+        return snapshot
+
+    snapshot = _build_course_snapshot(course_key, version)
+    timeout = getattr(settings, 'SUMMARY_ENABLEMENT_CACHE_TIMEOUT', DEFAULT_ENABLEMENT_CACHE_TIMEOUT)
+    cache.set(snapshot_key, snapshot, timeout)
+    return snapshot
@@ -35,3 +35,16 @@ def _get_course_units(course_key):
     return AIAsideUnitEnabled.objects.filter(
         course_key=course_key,
     )
+
+
+def _get_course_enabled(course_key):
+    "Private method that gets the enabled value of a course, or None if it has no settings"
+    return AIAsideCourseEnabled.objects.filter(
+        course_key=course_key,
+    ).values_list('enabled', flat=True).first()
+
+
+def _get_units_enabled(course_key):
+    "Private method that maps the unit keys of a course to their enabled value"
+    units = _get_course_units(course_key)
+    return {str(unit_key): enabled for unit_key, enabled in units.values_list('unit_key', 'enabled')}
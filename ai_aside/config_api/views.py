@@ -4,10 +4,14 @@ Implements a simple REST API for updating unit and course settings.
 Setters:
     POST: ai_aside/v1/:course_id - (payload: { enabled: True/False })
     POST: ai_aside/v1/:course_id/:unit_id - (payload: { enabled: True/False })
+    POST: ai_aside/v1/:course_id/units - (payload: [{ unit_id: :unit_id, enabled: True/False }, ...])
 
 Getters:
     GET: ai_aside/v1/:course_id - (response: { success: True/False, enabled: True/False })
     GET: ai_aside/v1/:course_id/:unit_id - (response: { success: True/False, enabled: True/False })
+    GET: ai_aside/v1/:course_id/units?page=:page&page_size=:page_size - (response: {
+        success: True/False, enabled: True/False, count: N, page: N, num_pages: N,
+        units: [{ unit_id: :unit_id, enabled: True/False }, ...] })
 
 Delete:
     DELETE: ai_aside/v1/:course_id - (response: { success: True/False })
@@ -15,20 +19,27 @@ Delete:
 
 Both GET and DELETE methods respond with a 404 if the setting cannot be found.
 """
+from math import ceil
+
 from ai_aside.config_api.api import (
     delete_course_settings,
     delete_unit_settings,
     get_course_settings,
     get_unit_settings,
+    get_units_settings,
     is_summary_config_enabled,
     reset_course_unit_settings,
     set_course_settings,
     set_unit_settings,
+    set_units_settings,
 )
 from ai_aside.config_api.exceptions import AiAsideException, AiAsideNotFoundException
 from ai_aside.config_api.validators import validate_course_key, validate_unit_key
 from ai_aside.config_api.view_utils import AiAsideAPIView, APIResponse, handle_errors
 
+UNITS_PAGE_SIZE = 100
+UNITS_MAX_PAGE_SIZE = 1000
+
 
 class CourseSummaryConfigEnabledAPIView(AiAsideAPIView):
     """
@@ -128,3 +139,46 @@ class UnitEnabledAPIView(AiAsideAPIView):
         unit_key = validate_unit_key(unit_id)
         delete_unit_settings(course_key, unit_key,)
         return APIResponse(success=True)
+
+
+class UnitsEnabledAPIView(AiAsideAPIView):
+    """Handlers for the settings of many units of a course"""
+    @handle_errors
+    def get(self, request, course_id=None):
+        """Gets a page of the enabled states of the units of a course"""
+
+        course_key = validate_course_key(course_id)
+
+        try:
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', UNITS_PAGE_SIZE))
+        except ValueError as error:
+            raise AiAsideException('Invalid parameters') from error
+
+        if page < 1 or not 1 <= page_size <= UNITS_MAX_PAGE_SIZE:
+            raise AiAsideException('Invalid parameters')
+
+        settings = get_units_settings(course_key, offset=(page - 1) * page_size, limit=page_size)
+        settings['page'] = page
+        settings['num_pages'] = max(ceil(settings['count'] / page_size), 1)
+        return APIResponse(success=True, data=settings)
+
+    @handle_errors
+    def post(self, request, course_id=None):
+        """Sets the enabled state for a list of units"""
+
+        course_key = validate_course_key(course_id)
+
+        if not isinstance(request.data, list):
+            raise AiAsideException('Invalid parameters')
+
+        units_settings = {}
+        try:
+            for unit in request.data:
+                unit_key = validate_unit_key(unit['unit_id'])
+                units_settings[unit_key] = {'enabled': unit['enabled']}
+            set_units_settings(course_key, units_settings)
+        except (KeyError, TypeError) as error:
+            raise AiAsideException('Invalid parameters') from error
+
+        return APIResponse(success=True)
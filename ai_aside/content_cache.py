@@ -0,0 +1,388 @@
+"""
+Cache for the text extracted from unit children.
+
+Extracting a child's text means rendering its HTML or fetching its transcript,
+and the result only changes when course authors publish. Entries are keyed by
+the child's definition id and edit dates, so a publish naturally misses, and
+by what else the text depends on: the HTML_TAGS_TO_REMOVE setting and the
+version of the extraction. They hold a hash of the text next to it, so it is
+only hashed once. HTML rendered differently for each learner is not cached.
+
+The cache is a chain of pluggable backends, configured by dotted path in
+SUMMARY_CONTENT_CACHE_BACKENDS. By default the Django cache is checked first
+and a database table is the fallback; hits in a later backend are copied
+into the earlier ones.
+
+Transcripts have a cache of their own, keyed by what the platform uses to find
+them rather than by the video definition, as a transcript can be uploaded or
+replaced without editing the video. It only lives in the Django cache, for
+a day, and missing transcripts are cached too, for a shorter time. Video text
+never goes through the contents cache.
+
+Units found too short to summarize are remembered as well, keyed by their
+edit dates, so rendering them again does not fetch their children.
+"""
+
+import hashlib
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from edx_django_utils.cache import get_cache_key
+
+from ai_aside.models import AIAsideContentCache
+
+CONTENT_CACHE_KEY_PREFIX = 'ai_aside.content'
+# bump when the text extracted from the same child changes, so cached text is not reused
+CONTENT_EXTRACTION_VERSION = 2
+# substituted by the platform with the anonymous id of the learner the HTML is rendered for
+USER_ID_SUBSTITUTION = '%%USER_ID%%'
+
+DEFAULT_CONTENT_CACHE_BACKENDS = [
+    'ai_aside.content_cache.DjangoCacheBackend',
+    'ai_aside.content_cache.DatabaseBackend',
+]
+DEFAULT_CONTENT_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # a week, publishes change the key anyway
+DEFAULT_CONTENT_CACHE_MAX_ENTRIES = 50000
+DEFAULT_CONTENT_CACHE_CULL_FREQUENCY = 100  # sets per size check, on average
+DEFAULT_CONTENT_CACHE_ACCESS_INTERVAL = 60 * 60  # precision of the access dates the cull goes by
+
+TRANSCRIPT_CACHE_KEY_PREFIX = 'ai_aside.transcript'
+DEFAULT_TRANSCRIPT_CACHE_TIMEOUT = 60 * 60 * 24
+DEFAULT_TRANSCRIPT_MISSING_CACHE_TIMEOUT = 60 * 60
+
+NOT_SUMMARIZABLE_CACHE_KEY_PREFIX = 'ai_aside.not_summarizable'
+DEFAULT_NOT_SUMMARIZABLE_CACHE_TIMEOUT = 60 * 60  # a transcript may be uploaded meanwhile
+
+_MISS = (False, None, None)
+
+
+class DjangoCacheBackend:
+    """
+    Content cache backend on top of a Django cache.
+
+    Eviction is left to the cache itself, which is LRU for locmem and memcached.
+    """
+
+    def __init__(self, timeout):
+        """Use the Django cache named by SUMMARY_CONTENT_CACHE_ALIAS."""
+        self.timeout = timeout
+        self.cache = caches[getattr(settings, 'SUMMARY_CONTENT_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)]
+
+    def get(self, key):
+        """Return a (found, text, content_hash) tuple, text and hash may be None when found."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return _MISS
+        # entries are wrapped in a tuple so that a cached None is not a miss
+        if len(entry) == 1:  # cached without a hash
+            return True, entry[0], None
+        return True, entry[0], entry[1]
+
+    def set(self, key, text, text_hash=None):
+        """Store the text and its hash for the key."""
+        entry = (text,) if text_hash is None else (text, text_hash)
+        self.cache.set(key, entry, self.timeout)
+
+
+class DatabaseBackend:
+    """
+    Content cache backend on top of the AIAsideContentCache table.
+
+    Entries older than the timeout are misses, and when the table grows past
+    SUMMARY_CONTENT_CACHE_MAX_ENTRIES the least recently accessed third is culled.
+
+    Counting the table is not free, so its size is only checked on one set in
+    SUMMARY_CONTENT_CACHE_CULL_FREQUENCY, at random. Likewise the access date
+    of an entry is only written when it is older than
+    SUMMARY_CONTENT_CACHE_ACCESS_INTERVAL seconds.
+    """
+
+    def __init__(self, timeout):
+        """Read the size limit and how often it is enforced from settings."""
+        self.timeout = timeout
+        self.max_entries = getattr(settings, 'SUMMARY_CONTENT_CACHE_MAX_ENTRIES', DEFAULT_CONTENT_CACHE_MAX_ENTRIES)
+        self.cull_frequency = getattr(
+            settings, 'SUMMARY_CONTENT_CACHE_CULL_FREQUENCY', DEFAULT_CONTENT_CACHE_CULL_FREQUENCY,
+        )
+        self.access_interval = getattr(
+            settings, 'SUMMARY_CONTENT_CACHE_ACCESS_INTERVAL', DEFAULT_CONTENT_CACHE_ACCESS_INTERVAL,
+        )
+
+    def get(self, key):
+        """Return a (found, text, content_hash) tuple, text and hash may be None when found."""
+        now = timezone.now()
+        try:
+            record = AIAsideContentCache.objects.get(cache_key=key)
+        except AIAsideContentCache.DoesNotExist:
+            return _MISS
+
+        if record.created < now - timedelta(seconds=self.timeout):
+            record.delete()
+            return _MISS
+
+        if record.accessed < now - timedelta(seconds=self.access_interval):
+            AIAsideContentCache.objects.filter(id=record.id).update(accessed=now)
+        return True, record.content_text, record.content_hash
+
+    def set(self, key, text, text_hash=None):
+        """Store the text and its hash for the key, now and then culling old entries if needed."""
+        now = timezone.now()
+        AIAsideContentCache.objects.update_or_create(
+            cache_key=key,
+            defaults={'content_text': text, 'content_hash': text_hash, 'created': now, 'accessed': now},
+        )
+        if random.randrange(max(self.cull_frequency, 1)) == 0:
+            self._cull()
+
+    def _cull(self):
+        """Delete the least recently accessed entries when the table is too big."""
+        count = AIAsideContentCache.objects.count()
+        if count <= self.max_entries:
+            return
+
+        cull_count = count - self.max_entries + self.max_entries // 3
+        stale_ids = list(
+            AIAsideContentCache.objects.order_by('accessed').values_list('id', flat=True)[:cull_count]
+        )
+        AIAsideContentCache.objects.filter(id__in=stale_ids).delete()
+
+
+class ContentCache:
+    """
+    A chain of content cache backends, checked in order.
+    """
+
+    def __init__(self, backends):
+        """Check the backends in the given order."""
+        self.backends = backends
+
+    def get(self, key):
+        """Return a (found, text, content_hash) tuple from the first backend holding the key."""
+        for index, backend in enumerate(self.backends):
+            found, text, text_hash = backend.get(key)
+            if found:
+                for earlier in self.backends[:index]:
+                    earlier.set(key, text, text_hash)
+                return found, text, text_hash
+        return _MISS
+
+    def set(self, key, text, text_hash=None):
+        """Store the text and its hash in every backend."""
+        for backend in self.backends:
+            backend.set(key, text, text_hash)
+
+
+def get_content_cache():
+    """
+    Build the content cache from settings.
+    """
+    timeout = getattr(settings, 'SUMMARY_CONTENT_CACHE_TIMEOUT', DEFAULT_CONTENT_CACHE_TIMEOUT)
+    backend_paths = getattr(settings, 'SUMMARY_CONTENT_CACHE_BACKENDS', DEFAULT_CONTENT_CACHE_BACKENDS)
+    return ContentCache([import_string(path)(timeout) for path in backend_paths])
+
+
+def content_hash(text):
+    """
+    Get a stable hash of a text, for telling whether extracted contents changed.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def child_content_key(child):
+    """
+    Get the content cache key of a child block, or None if it cannot be cached.
+
+    Definitions are immutable, the edit dates are included to also catch
+    changes that do not create a new definition. Children whose raw data
+    has the learner substituted in when rendered cannot be cached.
+    """
+    definition_id = getattr(getattr(child, 'scope_ids', None), 'def_id', None)
+    if definition_id is None:
+        return None
+
+    if USER_ID_SUBSTITUTION in (getattr(child, 'data', None) or ''):
+        return None
+
+    key = get_cache_key(
+        definition_id=definition_id,
+        edited_on=getattr(child, 'edited_on', None),
+        published_on=getattr(child, 'published_on', None),
+        tags_to_remove=getattr(settings, 'HTML_TAGS_TO_REMOVE', None),
+        version=CONTENT_EXTRACTION_VERSION,
+    )
+    return f'{CONTENT_CACHE_KEY_PREFIX}.{key}'
+
+
+def lookup_child_contents(child):
+    """
+    Look up the cached contents of a child block and their hash.
+
+    Returns: tuple of the form:
+        `(found, text, content_hash)`
+    """
+    key = child_content_key(child)
+    if key is None:
+        return _MISS
+
+    found, text, text_hash = get_content_cache().get(key)
+    if found and text_hash is None and text is not None:
+        # cached before hashes were
+        text_hash = content_hash(text)
+    return found, text, text_hash
+
+
+def store_child_contents(child, text):
+    """
+    Cache the contents of a child block with their hash, and return the hash.
+
+    None, meaning there are no contents yet, is not cached and has no hash.
+    """
+    if text is None:
+        return None
+
+    text_hash = content_hash(text)
+    key = child_content_key(child)
+    if key is not None:
+        get_content_cache().set(key, text, text_hash)
+    return text_hash
+
+
+def get_cached_child_contents(child, extract):
+    """
+    Get the contents of a child block and their hash, calling extract() only on a cache miss.
+
+    The result of extract() is a string or None, and only strings are cached.
+
+    Returns: tuple of the form:
+        `(text, content_hash)`
+    """
+    found, text, text_hash = lookup_child_contents(child)
+    if found:
+        return text, text_hash
+
+    text = extract()
+    return text, store_child_contents(child, text)
+
+
+def transcript_key(video_block):
+    """
+    Get the transcript cache key of a video block, or None if it cannot be cached.
+
+    The key covers the video id in edxval and the transcript files and
+    language of the block, which is how the platform finds its transcript.
+    """
+    usage_id = getattr(getattr(video_block, 'scope_ids', None), 'usage_id', None)
+    if usage_id is None:
+        return None
+
+    key = get_cache_key(
+        usage_id=str(usage_id),
+        edx_video_id=getattr(video_block, 'edx_video_id', None),
+        transcript_language=getattr(video_block, 'transcript_language', None),
+        transcripts=sorted((getattr(video_block, 'transcripts', None) or {}).items()),
+        sub=getattr(video_block, 'sub', None),
+        youtube_id=getattr(video_block, 'youtube_id_1_0', None),
+    )
+    return f'{TRANSCRIPT_CACHE_KEY_PREFIX}.{key}'
+
+
+def lookup_transcript(video_block):
+    """
+    Look up the cached text transcript of a video block and its hash.
+
+    Returns: tuple of the form:
+        `(found, text, content_hash)`
+    where text and hash are None if the video was found to have no transcript.
+    """
+    key = transcript_key(video_block)
+    if key is None:
+        return _MISS
+
+    found, text, text_hash = DjangoCacheBackend(None).get(key)
+    if found and text_hash is None and text is not None:
+        # cached before hashes were
+        text_hash = content_hash(text)
+    return found, text, text_hash
+
+
+def store_transcript(video_block, text):
+    """
+    Cache the text transcript of a video block with its hash, and return the hash.
+
+    None, meaning the video has no transcript, is cached for
+    SUMMARY_TRANSCRIPT_MISSING_CACHE_TIMEOUT seconds only, and has no hash.
+    """
+    text_hash = None if text is None else content_hash(text)
+
+    key = transcript_key(video_block)
+    if key is not None:
+        if text is None:
+            timeout = getattr(
+                settings, 'SUMMARY_TRANSCRIPT_MISSING_CACHE_TIMEOUT', DEFAULT_TRANSCRIPT_MISSING_CACHE_TIMEOUT,
+            )
+        else:
+            timeout = getattr(settings, 'SUMMARY_TRANSCRIPT_CACHE_TIMEOUT', DEFAULT_TRANSCRIPT_CACHE_TIMEOUT)
+        DjangoCacheBackend(timeout).set(key, text, text_hash)
+    return text_hash
+
+
+def get_cached_transcript(video_block, fetch):
+    """
+    Get the text transcript of a video block and its hash, calling fetch() only on a cache miss.
+
+    The result of fetch() is the text or None if the video has no transcript.
+
+    Returns: tuple of the form:
+        `(text, content_hash)`
+    """
+    found, text, text_hash = lookup_transcript(video_block)
+    if found:
+        return text, text_hash
+
+    text = fetch()
+    return text, store_transcript(video_block, text)
+
+
+def _not_summarizable_key(block):
+    """
+    Get the key of the not summarizable decision on a unit, or None if it cannot be cached.
+    """
+    usage_id = getattr(getattr(block, 'scope_ids', None), 'usage_id', None)
+    if usage_id is None:
+        return None
+
+    key = get_cache_key(
+        usage_id=str(usage_id),
+        edited_on=getattr(block, 'edited_on', None),
+        subtree_edited_on=getattr(block, 'subtree_edited_on', None),
+        published_on=getattr(block, 'published_on', None),
+        min_size=settings.SUMMARY_HOOK_MIN_SIZE,
+        lazy=getattr(settings, 'SUMMARY_HOOK_LAZY', False),
+    )
+    return f'{NOT_SUMMARIZABLE_CACHE_KEY_PREFIX}.{key}'
+
+
+def is_known_not_summarizable(block):
+    """
+    Check whether a unit was found not summarizable since it was last edited.
+    """
+    key = _not_summarizable_key(block)
+    if key is None:
+        return False
+
+    found, _, _ = DjangoCacheBackend(None).get(key)
+    return found
+
+
+def remember_not_summarizable(block):
+    """
+    Remember that a unit is not summarizable, until it is edited.
+    """
+    key = _not_summarizable_key(block)
+    if key is not None:
+        timeout = getattr(settings, 'SUMMARY_NOT_SUMMARIZABLE_CACHE_TIMEOUT', DEFAULT_NOT_SUMMARIZABLE_CACHE_TIMEOUT)
+        DjangoCacheBackend(timeout).set(key, None)
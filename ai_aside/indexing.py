@@ -0,0 +1,72 @@
+"""
+Building the summary index of a course.
+
+Publishing a course updates its index incrementally: a unit whose children
+have the same definitions and edit dates as when it was indexed keeps its
+entry, and only the other units get their contents extracted. Units with
+videos indexed as not summarizable are extracted again on every publish, as
+their transcripts may have been uploaded since without any block being
+edited. Entries are only written when they changed.
+"""
+
+import logging
+
+from ai_aside.block import (
+    _get_unit_children,
+    _has_video_children,
+    _is_indexed_summarizable,
+    _last_updated,
+    children_signature,
+    index_unit,
+)
+from ai_aside.platform_imports import get_course_units
+from ai_aside.summary_index import get_course_index_entries, save_course_index
+
+log = logging.getLogger(__name__)
+
+
+def index_course(course_key):
+    """
+    Update the summary index of a course from its published units.
+
+    Units whose contents cannot be extracted are left out of the index,
+    so they are still checked when rendered.
+
+    Returns the number of units whose contents were extracted.
+    """
+    stored = get_course_index_entries(course_key)
+    changed = {}
+    extracted = 0
+    redated = 0
+
+    for block in get_course_units(course_key):
+        usage_id = block.scope_ids.usage_id
+        previous = stored.pop(str(usage_id), None)
+        try:
+            children = _get_unit_children(block)
+            if (
+                previous is not None
+                and previous['children_signature'] == children_signature(block, children)
+                and (_is_indexed_summarizable(previous) or not _has_video_children(children))
+            ):
+                # same contents, but the unit itself may have been published again
+                last_updated = max(previous['last_updated'], _last_updated(block, []))
+                if last_updated != previous['last_updated']:
+                    changed[usage_id] = {**previous, 'last_updated': last_updated}
+                    redated += 1
+                continue
+
+            entry = index_unit(block, children)
+            extracted += 1
+            if entry != previous:
+                changed[usage_id] = entry
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            log.error(f'Summary index could not extract the contents of {usage_id}: {ex}')
+
+    if changed or stored:
+        save_course_index(course_key, changed, removed_unit_keys=list(stored))
+    log.info(
+        f'Summary index updated for {course_key}: {extracted} units extracted, '
+        f'{len(changed) - redated} updated, {redated} redated, {len(stored)} removed'
+    )
+    return extracted
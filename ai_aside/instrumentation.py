@@ -0,0 +1,118 @@
+"""
+Timing of the phases of the summary aside.
+
+Phases are timed with timed() and reported to the backends configured by
+dotted path in SUMMARY_INSTRUMENTATION_BACKENDS. A backend is any class
+with a record(phase, seconds) method. There are none by default, and then
+timed() costs a cached lookup and returns a shared no-op context manager.
+
+Backends keep their state for the request, so phases are only timed in the
+request thread: work done on the thread pool is timed by waiting for it.
+
+The phases timed are:
+    flags: evaluating the waffle flags
+    enablement: looking up whether summaries are enabled for the unit
+    child_fetch: fetching the children of a unit and their HTML
+    html_to_text: converting the HTML of children to text
+    transcript: fetching the transcripts of videos, or waiting for them from the thread pool
+    render: rendering the summary hook template
+"""
+
+import logging
+import time
+from contextlib import nullcontext
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from edx_django_utils.cache import RequestCache
+from edx_django_utils.monitoring import set_custom_attribute
+
+log = logging.getLogger(__name__)
+
+DEFAULT_INSTRUMENTATION_BACKENDS = []
+REQUEST_CACHE_NAMESPACE = 'ai_aside.instrumentation'
+ATTRIBUTE_PREFIX = 'ai_aside'
+
+_NOT_TIMED = nullcontext()
+
+
+class CustomAttributeBackend:
+    """
+    Report the time spent in each phase during the request as New Relic custom attributes.
+
+    Phases run several times per request, so their total time and count are
+    reported, as `ai_aside.<phase>.ms` and `ai_aside.<phase>.count`.
+    """
+
+    def record(self, phase, seconds):
+        """Add the time to the totals of the phase in the request."""
+        totals = RequestCache(REQUEST_CACHE_NAMESPACE).data.setdefault(phase, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+        set_custom_attribute(f'{ATTRIBUTE_PREFIX}.{phase}.count', totals[0])
+        set_custom_attribute(f'{ATTRIBUTE_PREFIX}.{phase}.ms', round(totals[1] * 1000, 3))
+
+
+class LogBackend:
+    """
+    Log the time spent in each phase at debug level.
+    """
+
+    def record(self, phase, seconds):
+        """Log the time of the phase."""
+        log.debug(f'{ATTRIBUTE_PREFIX}.{phase} took {seconds * 1000:.3f}ms')
+
+
+@lru_cache(maxsize=1)
+def _get_backends():
+    """
+    Build the instrumentation backends from settings, once.
+    """
+    paths = getattr(settings, 'SUMMARY_INSTRUMENTATION_BACKENDS', DEFAULT_INSTRUMENTATION_BACKENDS)
+    return tuple(import_string(path)() for path in paths)
+
+
+@receiver(setting_changed)
+def _reset_backends(setting, **_kwargs):
+    """
+    Forget the backends when the setting changes, as it does in tests.
+    """
+    if setting == 'SUMMARY_INSTRUMENTATION_BACKENDS':
+        _get_backends.cache_clear()
+
+
+class _Timer:
+    """
+    Time a phase and report it to the backends, even if it raises.
+    """
+
+    __slots__ = ('phase', 'backends', 'started')
+
+    def __init__(self, phase, backends):
+        self.phase = phase
+        self.backends = backends
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc_info):
+        seconds = time.perf_counter() - self.started
+        for backend in self.backends:
+            backend.record(self.phase, seconds)
+        return False
+
+
+def timed(phase):
+    """
+    Get a context manager timing a phase of the summary aside.
+    """
+    backends = _get_backends()
+    if not backends:
+        return _NOT_TIMED
+
+    return _Timer(phase, backends)
@@ -0,0 +1,130 @@
+"""
+Warm the caches of ai_aside for some courses.
+
+After a deploy or a cache flush, the first learners to see each unit pay for
+extracting its contents. This command extracts them ahead of time, filling
+the content and transcript caches, and caches the enablement settings.
+
+Examples:
+
+    ./manage.py ai_aside_warm_cache --course course-v1:edX+DemoX+Demo_Course
+    ./manage.py ai_aside_warm_cache --all-enabled --workers 8
+"""
+
+import logging
+import time
+from concurrent import futures
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from ai_aside.block import _parse_children_contents
+from ai_aside.config_api.cache import get_course_snapshot
+from ai_aside.models import AIAsideCourseEnabled
+from ai_aside.platform_imports import get_course_units
+
+log = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+PROGRESS_EVERY = 100
+
+
+def _warm_unit(block):
+    """
+    Extract the contents of a unit, filling the content and transcript caches.
+
+    Returns whether it succeeded.
+    """
+    try:
+        _parse_children_contents(block)
+        return True
+    except Exception as ex:  # pylint: disable=broad-exception-caught
+        log.error(f'Could not warm the caches of {block.scope_ids.usage_id}: {ex}')
+        return False
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """
+    Warm the content, transcript and enablement caches of some courses.
+    """
+
+    help = 'Extract the contents of every published unit of some courses ahead of time, to fill the caches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course',
+            action='append',
+            default=[],
+            dest='courses',
+            help='Key of a course to warm, can be given several times.',
+        )
+        parser.add_argument(
+            '--all-enabled',
+            action='store_true',
+            help='Warm every course with summaries enabled in its settings.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULT_WORKERS,
+            help='Number of units warmed concurrently.',
+        )
+
+    def handle(self, *args, **options):
+        course_keys = []
+        for course_id in options['courses']:
+            try:
+                course_keys.append(CourseKey.from_string(course_id))
+            except InvalidKeyError as error:
+                raise CommandError(f'{course_id} is not a valid CourseKey') from error
+
+        if options['all_enabled']:
+            course_keys.extend(AIAsideCourseEnabled.objects.filter(enabled=True).values_list('course_key', flat=True))
+
+        if not course_keys:
+            raise CommandError('Give at least one --course, or --all-enabled')
+
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        started = time.monotonic()
+        total = 0
+        with futures.ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for course_key in course_keys:
+                total += self._warm_course(pool, course_key)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Warmed {total} units of {len(course_keys)} courses in {elapsed:.1f}s '
+            f'({total / elapsed if elapsed else 0:.1f} units/s)'
+        )
+
+    def _warm_course(self, pool, course_key):
+        """
+        Warm the caches of one course, returning the number of units warmed.
+        """
+        started = time.monotonic()
+        get_course_snapshot(course_key)
+
+        blocks = get_course_units(course_key)
+        warmed = 0
+        failed = 0
+        for done, succeeded in enumerate(pool.map(_warm_unit, blocks), start=1):
+            if succeeded:
+                warmed += 1
+            else:
+                failed += 1
+
+            if done % PROGRESS_EVERY == 0:
+                self.stdout.write(f'{course_key}: {done}/{len(blocks)} units')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{course_key}: warmed {warmed} units, {failed} failed, in {elapsed:.1f}s '
+            f'({warmed / elapsed if elapsed else 0:.1f} units/s)'
+        )
+        return warmed
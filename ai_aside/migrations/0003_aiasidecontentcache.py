@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_aside', '0002_auto_20230720_1544'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIAsideContentCache',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=255, unique=True)),
+                ('content_text', models.TextField(null=True)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('accessed', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:01
+
+import opaque_keys.edx.django.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_aside', '0003_aiasidecontentcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIAsideSummaryIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course_key', opaque_keys.edx.django.models.CourseKeyField(db_index=True, max_length=255)),
+                ('unit_key', opaque_keys.edx.django.models.UsageKeyField(max_length=255)),
+                ('content_length', models.PositiveIntegerField(default=0)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('last_updated', models.DateTimeField(null=True)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('course_key', 'unit_key')},
+            },
+        ),
+    ]
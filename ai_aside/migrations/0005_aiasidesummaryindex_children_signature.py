@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_aside', '0004_aiasidesummaryindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiasidesummaryindex',
+            name='children_signature',
+            field=models.CharField(default='', max_length=32),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_aside', '0005_aiasidesummaryindex_children_signature'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiasidecontentcache',
+            name='content_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+    ]
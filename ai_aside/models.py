@@ -64,3 +64,65 @@ class AIAsideUnitEnabled(models.Model):
                 enabled=self.enabled,
             )
         )
+
+
+class AIAsideContentCache(models.Model):
+    """
+    Text extracted from a unit child, kept as the database tier of the content cache.
+    """
+
+    cache_key = models.CharField(max_length=255, unique=True)
+    content_text = models.TextField(null=True)
+    content_hash = models.CharField(max_length=64, null=True)
+
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    accessed = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        """Query."""
+        return (
+            "id={id} "
+            "created={created} "
+            "cache_key={cache_key}".format(
+                id=self.id,
+                created=self.created.isoformat(),
+                cache_key=self.cache_key,
+            )
+        )
+
+
+class AIAsideSummaryIndex(models.Model):
+    """
+    Summarizable contents of a published unit, computed when its course is published.
+    """
+
+    course_key = CourseKeyField(db_index=True, max_length=255)
+    unit_key = UsageKeyField(max_length=255)
+    content_length = models.PositiveIntegerField(default=0)
+    item_count = models.PositiveIntegerField(default=0)
+    last_updated = models.DateTimeField(null=True)
+    children_signature = models.CharField(max_length=32, default='')
+
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Course and unit are unique together."""
+
+        unique_together = ('course_key', 'unit_key')
+
+    def __str__(self):
+        """Query."""
+        return (
+            "id={id} "
+            "created={created} "
+            "course_key={course_key} "
+            "unit_key={unit_key} "
+            "content_length={content_length}".format(
+                id=self.id,
+                created=self.created.isoformat(),
+                course_key=self.course_key,
+                unit_key=self.unit_key,
+                content_length=self.content_length,
+            )
+        )
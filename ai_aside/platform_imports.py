@@ -28,6 +28,23 @@ def get_block(usage_key):
     return modulestore().get_item(usage_key)
 
 
+def get_course_units(course_key):
+    """Get the published units of a course from the module store."""
+    # pylint: disable=import-error, import-outside-toplevel
+    from xmodule.modulestore import ModuleStoreEnum
+    from xmodule.modulestore.django import modulestore
+    store = modulestore()
+    with store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+        return store.get_items(course_key, qualifiers={'category': 'vertical'})
+
+
+def get_course_published_signal():
+    """Get the signal the module store sends when a course is published."""
+    # pylint: disable=import-error, import-outside-toplevel
+    from xmodule.modulestore.django import SignalHandler
+    return SignalHandler.course_published
+
+
 def can_change_summaries_settings(user, course_key):
     """Check if the user can change the summaries settings by checking for studio write access."""
     # pylint: disable=import-error, import-outside-toplevel
@@ -0,0 +1,56 @@
+"""
+Request-scoped memoization.
+
+Values are kept in an edx_django_utils RequestCache, which the platform clears
+at the end of every request, so a memoized function runs at most once per
+request for the same arguments.
+"""
+
+from functools import wraps
+
+from edx_django_utils.cache import RequestCache
+
+STATS_NAMESPACE = 'ai_aside.request_cache.stats'
+
+
+def _record(namespace, outcome):
+    stats = RequestCache(STATS_NAMESPACE).data.setdefault(namespace, {'hits': 0, 'misses': 0})
+    stats[outcome] += 1
+
+
+def request_cache_stats(namespace):
+    """
+    Get the hit and miss counters of a namespace for the current request.
+
+    Returns: dictionary of the form:
+        `{'hits': int, 'misses': int}`
+    """
+    return dict(RequestCache(STATS_NAMESPACE).data.get(namespace, {'hits': 0, 'misses': 0}))
+
+
+def request_cached(namespace):
+    """
+    Memoize a function for the duration of the request.
+
+    Arguments must be hashable, and several functions can share a namespace.
+    The wrapped function gets a clear() attribute dropping everything memoized
+    in its namespace, for use after writes.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = RequestCache(namespace)
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            cached = cache.get_cached_response(key)
+            if cached.is_found:
+                _record(namespace, 'hits')
+                return cached.value
+
+            _record(namespace, 'misses')
+            value = func(*args, **kwargs)
+            cache.set(key, value)
+            return value
+
+        wrapper.clear = RequestCache(namespace).clear
+        return wrapper
+    return decorator
@@ -0,0 +1,33 @@
+"""
+Handlers of the platform signals ai_aside listens to.
+"""
+
+import logging
+
+from django.conf import settings
+
+from ai_aside.platform_imports import get_course_published_signal
+from ai_aside.tasks import schedule_index_course
+
+log = logging.getLogger(__name__)
+
+
+def handle_course_published(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Update the summary index of a course when it is published, if SUMMARY_INDEX_ENABLED is set.
+    """
+    if getattr(settings, 'SUMMARY_INDEX_ENABLED', False):
+        schedule_index_course(course_key)
+
+
+def connect_signals():
+    """
+    Connect the handlers to the signals of the module store, when running in the platform.
+    """
+    try:
+        course_published = get_course_published_signal()
+    except ImportError:
+        log.debug('Summary index not connected to course publishes, the module store is not installed')
+        return
+
+    course_published.connect(handle_course_published, dispatch_uid='ai_aside.signals.handle_course_published')
@@ -0,0 +1,95 @@
+"""
+Streamed, compressed JSON responses.
+
+A JSON object ending with a list is serialized one list item at a time, and
+compressed as it goes with the gzip or deflate encoding the client accepts,
+so neither the whole JSON text nor its compressed form is ever held in memory.
+
+The bytes of a compressed response differ from the identity ones, so its
+strong ETag gets the content encoding as a suffix.
+"""
+
+import json
+import zlib
+
+from webob import Response
+
+# zlib window bits giving the format of each content encoding
+ENCODING_WBITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+# compact like webob's json_body
+_dumps = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def negotiate_encoding(request):
+    """
+    Pick the content encoding of a response from the Accept-Encoding of the request, None for identity.
+    """
+    if request is None or 'Accept-Encoding' not in request.headers:
+        return None
+
+    offers = request.accept_encoding.acceptable_offers(list(ENCODING_WBITS))
+    return offers[0][0] if offers else None
+
+
+def encoded_etag(etag, encoding):
+    """
+    Make the ETag of a response in a content encoding from its identity ETag, None staying None.
+    """
+    if etag is None or encoding is None:
+        return etag
+    return f'{etag}-{encoding}'
+
+
+def iter_json_object(fields, list_name, items):
+    """
+    Serialize a JSON object of fields followed by a list of items, yielding bytes.
+    """
+    head = _dumps(fields)[:-1]
+    if fields:
+        head += ','
+    yield f'{head}{_dumps(list_name)}:['.encode('utf-8')
+
+    separator = ''
+    for item in items:
+        yield f'{separator}{_dumps(item)}'.encode('utf-8')
+        separator = ','
+
+    yield b']}'
+
+
+def iter_compressed(chunks, encoding):
+    """
+    Compress chunks of bytes with a content encoding, None leaving them as is.
+    """
+    if encoding is None:
+        yield from chunks
+        return
+
+    compressor = zlib.compressobj(wbits=ENCODING_WBITS[encoding])
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def streamed_json_response(request, fields, list_name, items, encoding=None):
+    """
+    Make a response streaming a JSON object of fields followed by a list of items.
+
+    The list is serialized last and lazily, so items can be a generator. The
+    content encoding is negotiated from the request unless it is given.
+    """
+    if encoding is None:
+        encoding = negotiate_encoding(request)
+    response = Response(
+        app_iter=iter_compressed(iter_json_object(fields, list_name, items), encoding),
+        content_type='application/json',
+    )
+    response.content_encoding = encoding
+    response.vary = ('Accept-Encoding',)
+    return response
@@ -0,0 +1,123 @@
+"""
+Index of the summarizable contents of published units.
+
+The index of a course is rebuilt when the course is published, so rendering
+a unit can tell whether it is worth a summary without extracting its children.
+Each course's index is cached whole in the Django cache and memoized for the
+request, so looking a unit up takes no query once the course is cached.
+
+An entry is only trusted while the unit is not newer than it, which also
+covers caches the publishing process could not invalidate.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from ai_aside.models import AIAsideSummaryIndex
+from ai_aside.request_cache import request_cached
+
+INDEX_CACHE_KEY_PREFIX = 'ai_aside.summary_index'
+DEFAULT_INDEX_CACHE_TIMEOUT = 60 * 60
+REQUEST_CACHE_NAMESPACE = 'ai_aside.summary_index'
+
+
+def _index_key(course_key):
+    return f'{INDEX_CACHE_KEY_PREFIX}.{course_key}'
+
+
+@request_cached(REQUEST_CACHE_NAMESPACE)
+def _get_course_index(course_key):
+    """
+    Get the index of a course as a dictionary of (content_length, item_count, last_updated) tuples.
+    """
+    key = _index_key(course_key)
+    index = cache.get(key)
+    if index is None:
+        rows = AIAsideSummaryIndex.objects.filter(course_key=course_key).values_list(
+            'unit_key', 'content_length', 'item_count', 'last_updated',
+        )
+        index = {
+            str(unit_key): (content_length, item_count, last_updated)
+            for unit_key, content_length, item_count, last_updated in rows.iterator()
+        }
+        cache.set(key, index, getattr(settings, 'SUMMARY_INDEX_CACHE_TIMEOUT', DEFAULT_INDEX_CACHE_TIMEOUT))
+    return index
+
+
+def get_unit_index(course_key, unit_key):
+    """
+    Get the index entry of a unit, or None if the unit is not indexed.
+
+    Returns: dictionary of the form:
+        `{'content_length': int, 'item_count': int, 'last_updated': datetime}`
+    """
+    entry = _get_course_index(course_key).get(str(unit_key))
+    if entry is None:
+        return None
+
+    content_length, item_count, last_updated = entry
+    return {
+        'content_length': content_length,
+        'item_count': item_count,
+        'last_updated': last_updated,
+    }
+
+
+def _course_index_changed(course_key):
+    """
+    Drop the cached index of a course after writing to it.
+    """
+    def drop():
+        cache.delete(_index_key(course_key))
+
+    drop()
+    transaction.on_commit(drop)
+    _get_course_index.clear()
+
+
+def get_course_index_entries(course_key):
+    """
+    Get the stored index entries of a course, for updating the index.
+
+    Returns: dictionary of the form:
+        `{unit_key_string: {'content_length': int, 'item_count': int, 'last_updated': datetime,
+          'children_signature': str}}`
+    """
+    rows = AIAsideSummaryIndex.objects.filter(course_key=course_key).values(
+        'unit_key', 'content_length', 'item_count', 'last_updated', 'children_signature',
+    )
+    return {str(row.pop('unit_key')): row for row in rows.iterator()}
+
+
+def save_course_index(course_key, units, removed_unit_keys=()):
+    """
+    Update the index entries of some units of a course, and remove others.
+
+    Expects: units as a dictionary mapping unit keys to entries of the form:
+        `{'content_length': int, 'item_count': int, 'last_updated': datetime, 'children_signature': str}`
+    where the signature is optional.
+    """
+    records = [
+        AIAsideSummaryIndex(course_key=course_key, unit_key=unit_key, **entry)
+        for unit_key, entry in units.items()
+    ]
+
+    database = AIAsideSummaryIndex.objects.db
+    # MySQL upserts on any unique index and refuses an explicit conflict target
+    if connections[database].features.supports_update_conflicts_with_target:
+        unique_fields = ['course_key', 'unit_key']
+    else:
+        unique_fields = None
+
+    with transaction.atomic(using=database):
+        if removed_unit_keys:
+            AIAsideSummaryIndex.objects.filter(course_key=course_key, unit_key__in=removed_unit_keys).delete()
+        AIAsideSummaryIndex.objects.bulk_create(
+            records,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=['content_length', 'item_count', 'last_updated', 'children_signature', 'modified'],
+        )
+    _course_index_changed(course_key)
@@ -0,0 +1,42 @@
+"""
+Background tasks of ai_aside.
+
+Tasks run on celery when it is installed, as it is in the platform, and
+otherwise right away in the calling process.
+"""
+
+from django.conf import settings
+from opaque_keys.edx.keys import CourseKey
+
+from ai_aside.indexing import index_course
+
+try:
+    from celery import shared_task  # pylint: disable=import-error
+except ImportError:
+    shared_task = None
+
+
+def _index_course(course_id):
+    """
+    Update the summary index of a course given its id.
+    """
+    return index_course(CourseKey.from_string(course_id))
+
+
+if shared_task is not None:
+    index_course_task = shared_task(name='ai_aside.tasks.index_course')(_index_course)
+else:
+    index_course_task = None
+
+
+def schedule_index_course(course_key):
+    """
+    Update the summary index of a course on celery, or right away without it.
+
+    SUMMARY_INDEX_ASYNC set to False also updates it right away.
+    """
+    if index_course_task is not None and getattr(settings, 'SUMMARY_INDEX_ASYNC', True):
+        index_course_task.delay(str(course_key))
+        return
+
+    _index_course(str(course_key))
@@ -2,61 +2,190 @@
 Text manipulation utils.
 """
 
+from functools import lru_cache
 from html.parser import HTMLParser
-from re import sub
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# elements without an end tag, which cannot hold any content to skip
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr',
+])
+
+
+@lru_cache(maxsize=1)
+def _get_tags_to_remove():
+    """
+    Get the tags whose content is not text, from the HTML_TAGS_TO_REMOVE setting.
+    """
+    tags = getattr(settings, 'HTML_TAGS_TO_REMOVE', None) or []
+    return frozenset(tag.lower() for tag in tags) - VOID_TAGS
+
+
+@receiver(setting_changed)
+def _reset_tags_to_remove(setting, **_kwargs):
+    """
+    Forget the tags to remove when the setting changes, as it does in tests.
+    """
+    if setting == 'HTML_TAGS_TO_REMOVE':
+        _get_tags_to_remove.cache_clear()
+
+
+def _normalize_whitespace_run(run):
+    """
+    Normalize a run of whitespace found between two words.
+    """
+    if not run:
+        return ''
+    if '\n' in run:
+        return '\n'
+    if '\r' in run:
+        return '\r'.join(' ' if part else '' for part in run.split('\r'))
+    return ' '
+
+
+def _collapse_spaces(text):
+    """
+    Collapse every run of whitespace in a text without new lines into a single space.
+    """
+    words = text.split()
+    if not words:
+        return ' ' if text else ''
+
+    collapsed = ' '.join(words)
+    if text[0].isspace():
+        collapsed = ' ' + collapsed
+    if text[-1].isspace():
+        collapsed += ' '
+    return collapsed
+
+
+def _normalize_line(line):
+    """
+    Normalize the whitespace of a line starting and ending with a word.
+    """
+    if '\r' in line:
+        # carriage returns are kept, and split the runs of spaces around them
+        return '\r'.join(_collapse_spaces(part) for part in line.split('\r'))
+    return ' '.join(line.split())
+
+
+def _normalize_words(text):
+    """
+    Normalize the whitespace of a text starting and ending with a word.
+    """
+    if '\n' not in text:
+        return _normalize_line(text)
+
+    # any run of whitespace holding a new line becomes that single new line
+    lines = (line.strip() for line in text.split('\n'))
+    return '\n'.join(_normalize_line(line) for line in lines if line)
+
+
+class _WhitespaceNormalizer:
+    """
+    Collects text fed in chunks, normalizing its whitespace like cleanup_text.
+
+    A run of whitespace at the end of a chunk may go on in the next one, so it is
+    held back until the next word shows up, and dropped if it trails the text.
+    """
+
+    def __init__(self):
+        """Start with no text."""
+        self._parts = []
+        self._pending = ''
+        self._started = False
+
+    def feed(self, data):
+        """Add a chunk of text."""
+        text = data.lstrip()
+        if not text:
+            if self._started:
+                self._pending += data
+            return
+
+        if self._started:
+            self._pending += data[:len(data) - len(text)]
+            self._parts.append(_normalize_whitespace_run(self._pending))
+
+        words = text.rstrip()
+        if '\n' in words or '\r' in words:
+            self._parts.append(_normalize_words(words))
+        else:
+            self._parts.append(' '.join(words.split()))
+        self._pending = text[len(words):]
+        self._started = True
+
+    def get_text(self):
+        """Join the normalized chunks, trimming the trailing whitespace."""
+        text = ''.join(self._parts)
+        if '\n' not in self._pending:
+            text += _normalize_whitespace_run(self._pending)
+        return text
 
 
 def cleanup_text(text):
     """
     Remove litter from replacing or manipulating text.
-    """
-    stripped = sub(r'[^\S\r\n]+', ' ', text)  # Removing extra spaces
-    stripped = sub(r'\n{2,}', '\n', stripped)  # Removing extra new lines
-    stripped = sub(r'(\s+)?\n(\s+)?', '\n', stripped)  # Removing starting extra spacesbetween new lines
-    stripped = sub(r'(^(\s+)\n?)|(\n(\s+)?$)', '', stripped)  # Trim
 
-    return stripped
+    Runs of whitespace holding a new line become that new line, other runs
+    become a single space, keeping carriage returns. Leading whitespace and a
+    trailing new line are dropped.
+    """
+    normalizer = _WhitespaceNormalizer()
+    normalizer.feed(text)
+    return normalizer.get_text()
 
 
 class _HTMLToTextHelper(HTMLParser):  # lint-amnesty, pylint: disable=abstract-method
     """
     Helper function for html_to_text below.
-    """
 
-    _is_content = True
+    Text inside a removed tag is skipped up to its end tag, counting the
+    removed tags still open so nested ones are handled.
+    """
 
     def __init__(self):
         HTMLParser.__init__(self)
         self.reset()
-        self.fed = []
+        self.fed = _WhitespaceNormalizer()
+        self._tags_to_remove = _get_tags_to_remove()
+        self._removed_depth = 0
 
     def handle_starttag(self, tag, _):
-        """On each tag, check whether this is a tag we think is content."""
-        tags_to_filter = getattr(settings, 'HTML_TAGS_TO_REMOVE', None)
-        self._is_content = not (tags_to_filter and tag in tags_to_filter)
+        """On each tag, check whether it opens content we should skip."""
+        if tag in self._tags_to_remove:
+            self._removed_depth += 1
+
+    def handle_endtag(self, tag):
+        """On each end tag, check whether it closes content we were skipping."""
+        if self._removed_depth and tag in self._tags_to_remove:
+            self._removed_depth -= 1
 
     def handle_data(self, data):
         """Handle tag data by appending text we think is content."""
-        if self._is_content:
-            self.fed.append(data)
+        if not self._removed_depth:
+            self.fed.feed(data)
 
     def handle_entityref(self, name):
         """If there is an entity, append the reference to the text."""
-        if self._is_content:
-            self.fed.append('&%s;' % name)
+        if not self._removed_depth:
+            self.fed.feed('&%s;' % name)
 
     def get_data(self):
-        """Join together the separate data chunks into one cohesive string."""
-        return ''.join(self.fed)
+        """Join together the separate data chunks into one cohesive, cleaned up string."""
+        return self.fed.get_text()
 
 
 def html_to_text(html):
-    """Strip the html tags off of the text to return plaintext."""
+    """
+    Strip the html tags off of the text to return plaintext.
+
+    Whitespace is normalized as the text is extracted, giving the same
+    result as cleanup_text without going over the whole text again.
+    """
     htmlstripper = _HTMLToTextHelper()
     htmlstripper.feed(html)
-    text = htmlstripper.get_data()
-    text = cleanup_text(text)
-
-    return text
+    return htmlstripper.get_data()
@@ -0,0 +1,74 @@
+"""
+A bounded thread pool shared by the whole process.
+
+It is used to extract the contents of unit children concurrently, and only
+exists once SUMMARY_CHILD_CONTENT_WORKERS is set to a number of threads.
+Work done on the pool runs outside of the request thread, so it must not rely
+on request state, and the database connections it opens are closed after it.
+"""
+
+import threading
+import time
+from concurrent import futures
+
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_CHILD_CONTENT_WORKERS = 0  # disabled
+DEFAULT_CHILD_CONTENT_TIMEOUT = 10
+
+_pool_lock = threading.Lock()
+_pool = (0, None)
+
+
+def get_child_content_pool():
+    """
+    Get the thread pool for extracting child contents, None if it is disabled.
+    """
+    global _pool  # pylint: disable=global-statement
+
+    workers = getattr(settings, 'SUMMARY_CHILD_CONTENT_WORKERS', DEFAULT_CHILD_CONTENT_WORKERS)
+    if not workers:
+        return None
+
+    with _pool_lock:
+        pool_workers, pool = _pool
+        if pool_workers != workers:
+            if pool is not None:
+                pool.shutdown(wait=False)
+            pool = futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai_aside')
+            _pool = (workers, pool)
+        return pool
+
+
+def _run_closing_connections(func):
+    try:
+        return func()
+    finally:
+        connections.close_all()
+
+
+class PooledTask:
+    """
+    A function running on a pool, whose result is awaited for a limited time.
+    """
+
+    def __init__(self, pool, func):
+        """Submit the function to the pool, starting the clock on its timeout."""
+        timeout = getattr(settings, 'SUMMARY_CHILD_CONTENT_TIMEOUT', DEFAULT_CHILD_CONTENT_TIMEOUT)
+        self.deadline = time.monotonic() + timeout
+        self.future = pool.submit(_run_closing_connections, func)
+
+    def result(self):
+        """
+        Wait for the result of the function until its deadline.
+
+        Returns: tuple of the form:
+            `(finished, result)`
+        where `finished` is False if the function timed out. Exceptions are raised.
+        """
+        try:
+            return True, self.future.result(timeout=max(self.deadline - time.monotonic(), 0))
+        except futures.TimeoutError:
+            self.future.cancel()
+            return False, None
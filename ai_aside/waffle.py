@@ -5,6 +5,8 @@ Xblocks do not generally use waffle flags,
 import at use time method taken from the LTI Xblock
 """
 
+from ai_aside.request_cache import request_cached
+
 # Namespace
 WAFFLE_NAMESPACE = 'summaryhook'
 
@@ -33,9 +35,12 @@ SUMMARYHOOK_STAFF_ONLY = 'summaryhook_staff_only'
 SUMMARYHOOK_SUMMARIES_CONFIGURATION = 'summaryhook_summaries_configuration'
 
 
+@request_cached('ai_aside.waffle')
 def _is_summaryhook_waffle_flag_enabled(flag_name, course_key):
     """
     Import and return Waffle flag for enabling the summary hook.
+
+    Evaluated once per request for each flag and course.
     """
     # pylint: disable=import-outside-toplevel
     try:
@@ -0,0 +1,108 @@
+"""
+Fake blocks standing in for the platform's unit and child blocks.
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytz
+from opaque_keys.edx.asides import AsideUsageKeyV2
+from opaque_keys.edx.keys import UsageKey
+from xblock.fields import ScopeIds
+
+from ai_aside.block import SummaryHookAside
+
+fake_transcript = 'This is the text version from the transcript'
+date1 = datetime(2023, 1, 2, 3, 4, 5, 0, pytz.UTC)
+date2 = datetime(2023, 6, 7, 8, 9, 10, 0, pytz.UTC)
+
+_LOREM_PARAGRAPH = '''
+<p>
+    Lorem ipsum dolor sit amet, <em>consectetur</em> adipiscing elit. Vivamus dapibus elit lacus,
+    at vehicula arcu vehicula in. In id felis arcu. <a href="#">Maecenas</a> elit quam, volutpat
+    cursus pharetra vel, tempor at lorem. Fusce luctus orci quis tempor aliquet.
+</p>'''
+
+
+def fake_get_transcript(child, lang=None, output_format='SRT', youtube_id=None):  # pylint: disable=unused-argument
+    return (fake_transcript, 'unused', 'unused')
+
+
+def fake_get_text_transcript(child):  # pylint: disable=unused-argument
+    return fake_transcript
+
+
+class FakeChild:
+    """Fake child block for testing, with fields overridden by keyword"""
+    transcript_download_format = 'txt'
+    # video fields the platform finds transcripts by
+    edx_video_id = None
+    transcript_language = 'en'
+    transcripts = {}
+    sub = ''
+    youtube_id_1_0 = None
+
+    def __init__(self, category, test_id='test-id', test_html='<div>This is a test</div>', **fields):
+        self.category = category
+        self.published_on = 'published-on-{}'.format(test_id)
+        self.edited_on = 'edited-on-{}'.format(test_id)
+        self.scope_ids = lambda: None
+        self.scope_ids.def_id = 'def-id-{}'.format(test_id)
+        self.scope_ids.usage_id = UsageKey.from_string(f'block-v1:edX+A+B+type@{category}+block@{test_id}')
+        self.html = test_html
+        self.transcript = fake_transcript
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def get_html(self):
+        if self.category == 'html':
+            return self.html
+
+        return None
+
+
+class FakeBlock:
+    "Fake block for testing, returns given children"
+    def __init__(self, children, usage_id=None, **fields):
+        self.children = children
+        self.category = 'vertical'
+        self.scope_ids = lambda: None
+        self.scope_ids.usage_id = usage_id or UsageKey.from_string('block-v1:edX+A+B+type@vertical+block@verticalD')
+        self.edited_on = date1
+        self.published_on = date1
+        my_runtime = MagicMock()
+        my_runtime.service.return_value.get_current_user.return_value.opt_attrs.get.return_value = "student audit"
+        self.runtime = my_runtime
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def get_children(self):
+        return self.children
+
+
+def fake_html(size_kb):
+    """
+    Make course-like HTML of about the given size in KB.
+    """
+    paragraphs = max(1, size_kb * 1024 // len(_LOREM_PARAGRAPH))
+    return '<div class="xblock">' + _LOREM_PARAGRAPH * paragraphs + '\n</div>'
+
+
+def make_vertical(html_children=0, html_kb=1, videos=0, usage_id=None):
+    """
+    Make a fake unit with html children of html_kb KB each, followed by videos.
+    """
+    children = [FakeChild('html', f'html-{index}', fake_html(html_kb)) for index in range(html_children)]
+    children += [FakeChild('video', f'video-{index}') for index in range(videos)]
+    for child in children:
+        child.published_on = child.edited_on = date1
+    return FakeBlock(children, usage_id)
+
+
+def make_aside(block):
+    """Make a summary aside of a unit, as staff."""
+    runtime = MagicMock()
+    runtime.user_is_staff = True
+    runtime.handler_url.return_value = 'http://lms/handler_noauth/summary_handler'
+    usage_id = AsideUsageKeyV2(block.scope_ids.usage_id, 'summary_hook_aside')
+    return SummaryHookAside(runtime=runtime, scope_ids=ScopeIds('user', 'summary_hook_aside', usage_id, usage_id))
@@ -0,0 +1,15 @@
+"""
+Clearing of the caches the aside reads through.
+"""
+
+from django.core.cache import cache
+from edx_django_utils.cache import RequestCache
+
+from ai_aside.config_api.cache import clear_local_cache
+
+
+def clear_caches():
+    """Clear the Django cache, the local settings cache and the request caches."""
+    cache.clear()
+    clear_local_cache()
+    RequestCache.clear_all_namespaces()
@@ -0,0 +1,16 @@
+"""
+An instrumentation backend keeping what it records, for tests.
+"""
+
+
+class RecordingBackend:
+    """Instrumentation backend appending every (phase, seconds) it records to a class-level list."""
+    records = []
+
+    def record(self, phase, seconds):
+        RecordingBackend.records.append((phase, seconds))
+
+    @classmethod
+    def phases(cls):
+        """The phases recorded so far, in order."""
+        return [phase for phase, _ in cls.records]
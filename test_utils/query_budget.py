@@ -0,0 +1,56 @@
+"""
+Query budgets of the call paths serving many units.
+
+Each call path has an explicit budget of database queries, and tests wrap
+the call path in assertQueryBudget, usually over many units, so a change
+querying for every unit fails with the offending SQL listed. Budgets are
+maximums, lower them when a call path gets cheaper.
+"""
+
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+QUERY_BUDGETS = {
+    # resolving a course once per request: the course settings and the unit overrides
+    'is_summary_enabled': 2,
+    'is_summary_enabled.memoized': 0,
+    'get_enabled_units': 2,
+    'get_enabled_units.memoized': 0,
+    'get_enabled_units.flag_disabled': 0,
+    'get_units_settings': 3,
+    'should_apply_to_block': 2,
+    'should_apply_to_block.memoized': 0,
+    # config views, per request, savepoints included
+    'views.course_configurable': 0,
+    'views.course_settings.get': 1,
+    'views.course_settings.post': 4,
+    'views.course_settings.post.reset': 5,
+    'views.course_settings.delete': 3,
+    'views.unit_settings.get': 1,
+    'views.unit_settings.post': 6,
+    'views.unit_settings.delete': 2,
+    'views.units_settings.get': 3,
+    'views.units_settings.post': 3,
+}
+
+
+class QueryBudgetMixin:
+    """
+    Assertions on the number of queries of the call paths in QUERY_BUDGETS, for TestCase subclasses.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, call_path, using=DEFAULT_DB_ALIAS):  # pylint: disable=invalid-name
+        """
+        Fail if the block runs more queries than the budget of the call path.
+        """
+        budget = QUERY_BUDGETS[call_path]
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+
+        queries = context.captured_queries
+        if len(queries) > budget:
+            listing = '\n'.join(f'{number}. {query["sql"]}' for number, query in enumerate(queries, start=1))
+            self.fail(f'{call_path} ran {len(queries)} queries, over its budget of {budget}:\n{listing}')
@@ -0,0 +1,55 @@
+"""
+Reference implementations and sample texts for the text utils.
+"""
+
+from html.parser import HTMLParser
+from re import sub
+
+
+def regex_cleanup_text(text):
+    """The regular expressions cleanup_text used to run, kept as its reference"""
+    stripped = sub(r'[^\S\r\n]+', ' ', text)
+    stripped = sub(r'\n{2,}', '\n', stripped)
+    stripped = sub(r'(\s+)?\n(\s+)?', '\n', stripped)
+    stripped = sub(r'(^(\s+)\n?)|(\n(\s+)?$)', '', stripped)
+    return stripped
+
+
+class _ChunksCollector(HTMLParser):  # pylint: disable=abstract-method
+    """Collects the data chunks of some html the way html_to_text sees them"""
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def handle_data(self, data):
+        """Keep every chunk."""
+        self.chunks.append(data)
+
+
+def html_chunks(html):
+    """The data chunks of some html, as html_to_text feeds them to its normalizer."""
+    collector = _ChunksCollector()
+    collector.feed(html)
+    return collector.chunks
+
+
+def realistic_html(paragraphs=300, rows=500):
+    """Course-like html with paragraphs of text and a long table"""
+    paragraph = '''
+        <p>
+            Lorem ipsum dolor <em>sit amet</em>,   consectetur adipiscing elit.
+            Sed volutpat velit sed dui <a href="#">fringilla</a> fermentum.\r
+        </p>
+    '''
+    row = '''
+            <tr>
+                <td>Nullam quis   velit</td>
+                <td><strong>at turpis</strong> lacinia convallis.</td>
+            </tr>'''
+    return f'''
+        <div>
+            <h2>Lorem Ipsum</h2>
+            {paragraph * paragraphs}
+            <table>{row * rows}
+            </table>
+        </div>'''
@@ -10,15 +10,19 @@ from ai_aside.config_api.api import (
     delete_course_settings,
     delete_unit_settings,
     get_course_settings,
+    get_enabled_units,
     get_unit_settings,
+    get_units_settings,
     is_course_settings_present,
     is_summary_enabled,
     reset_course_unit_settings,
     set_course_settings,
     set_unit_settings,
+    set_units_settings,
 )
 from ai_aside.config_api.exceptions import AiAsideNotFoundException
 from ai_aside.models import AIAsideCourseEnabled, AIAsideUnitEnabled
+from test_utils.query_budget import QueryBudgetMixin
 
 course_keys = [
     CourseKey.from_string('course-v1:edX+DemoX+Demo_Course'),
@@ -34,7 +38,7 @@ unit_keys = [
 
 
 @override_settings(SUMMARY_ENABLED_BY_DEFAULT=False)
-class TestApiMethods(TestCase):
+class TestApiMethods(QueryBudgetMixin, TestCase):
     """API Endpoint Method tests"""
     def test_set_course_settings(self):
         course_key = course_keys[0]
@@ -178,6 +182,74 @@ class TestApiMethods(TestCase):
 
         self.assertEqual(res.count(), 0)
 
+    def test_set_units_settings(self):
+        course_key = course_keys[0]
+
+        AIAsideUnitEnabled.objects.create(course_key=course_key, unit_key=unit_keys[0], enabled=True)
+
+        set_units_settings(course_key, {
+            unit_keys[0]: {'enabled': False},
+            unit_keys[1]: {'enabled': True},
+            unit_keys[2]: {'enabled': False},
+        })
+
+        res = AIAsideUnitEnabled.objects.filter(course_key=course_key)
+        self.assertEqual(res.count(), 3)
+        self.assertEqual(
+            dict(res.values_list('unit_key', 'enabled')),
+            {unit_keys[0]: False, unit_keys[1]: True, unit_keys[2]: False},
+        )
+
+    @patch('ai_aside.config_api.api.summaries_configuration_enabled')
+    def test_set_units_settings_invalidates(self, mock_enabled):
+        mock_enabled.return_value = True
+        course_key = course_keys[0]
+
+        self.assertFalse(is_summary_enabled(course_key, unit_keys[0]))
+
+        set_units_settings(course_key, {unit_keys[0]: {'enabled': True}})
+
+        self.assertTrue(is_summary_enabled(course_key, unit_keys[0]))
+
+    def test_set_units_settings_invalid_parameters(self):
+        course_key = course_keys[0]
+
+        with self.assertRaises(TypeError):
+            set_units_settings(course_key, {
+                unit_keys[0]: {'enabled': True},
+                unit_keys[1]: {'enabled': 'false'},
+            })
+
+        res = AIAsideUnitEnabled.objects.filter(course_key=course_key)
+
+        self.assertEqual(res.count(), 0)
+
+    def test_get_units_settings(self):
+        course_key = course_keys[0]
+
+        AIAsideCourseEnabled.objects.create(course_key=course_key, enabled=True)
+        for unit_key, enabled in zip(unit_keys, [False, True, False]):
+            AIAsideUnitEnabled.objects.create(course_key=course_key, unit_key=unit_key, enabled=enabled)
+        AIAsideUnitEnabled.objects.create(course_key=course_keys[1], unit_key=unit_keys[0], enabled=True)
+
+        with self.assertQueryBudget('get_units_settings'):
+            settings = get_units_settings(course_key, offset=1, limit=1)
+
+        self.assertEqual(settings, {
+            'enabled': True,
+            'count': 3,
+            'units': [{'unit_id': str(unit_keys[1]), 'enabled': True}],
+        })
+        self.assertEqual(
+            [unit['unit_id'] for unit in get_units_settings(course_key)['units']],
+            [str(unit_key) for unit_key in unit_keys],
+        )
+
+    def test_get_units_settings_default(self):
+        settings = get_units_settings(course_keys[0])
+
+        self.assertEqual(settings, {'enabled': False, 'count': 0, 'units': []})
+
     def test_get_unit_settings(self):
         course_key = course_keys[0]
         unit_key = unit_keys[0]
@@ -293,6 +365,104 @@ class TestApiMethods(TestCase):
         self.assertFalse(is_summary_enabled(course_key_false, unit_key_non_existent))
         self.assertFalse(is_summary_enabled(course_key_non_existent, unit_key_non_existent))
 
+    @patch('ai_aside.config_api.api.summaries_configuration_enabled')
+    def test_is_summary_enabled_memoized_for_request(self, mock_enabled):
+        mock_enabled.return_value = True
+        course_key = course_keys[0]
+        unit_key = unit_keys[0]
+
+        set_course_settings(course_key, {'enabled': True})
+
+        with self.assertQueryBudget('is_summary_enabled'):
+            self.assertTrue(is_summary_enabled(course_key, unit_key))
+            self.assertTrue(is_summary_enabled(course_key, unit_key))
+
+        set_unit_settings(course_key, unit_key, {'enabled': False})
+        self.assertFalse(is_summary_enabled(course_key, unit_key))
+
+        delete_unit_settings(course_key, unit_key)
+        self.assertTrue(is_summary_enabled(course_key, unit_key))
+
+        set_course_settings(course_key, {'enabled': False})
+        self.assertFalse(is_summary_enabled(course_key, unit_key))
+
+    @patch('ai_aside.config_api.api.summaries_configuration_enabled')
+    def test_get_enabled_units(self, mock_enabled):
+        mock_enabled.return_value = True
+        course_key = course_keys[0]
+
+        AIAsideCourseEnabled.objects.create(course_key=course_key, enabled=True)
+        AIAsideUnitEnabled.objects.create(course_key=course_key, unit_key=unit_keys[0], enabled=False)
+        AIAsideUnitEnabled.objects.create(course_key=course_key, unit_key=unit_keys[1], enabled=True)
+        AIAsideUnitEnabled.objects.create(course_key=course_keys[1], unit_key=unit_keys[2], enabled=False)
+
+        with self.assertQueryBudget('get_enabled_units'):
+            enablement = get_enabled_units(course_key)
+
+        self.assertEqual(enablement, {
+            'enabled': True,
+            'units': {str(unit_keys[0]): False, str(unit_keys[1]): True},
+        })
+
+        # the given units are picked from the cached course snapshot
+        with self.assertQueryBudget('get_enabled_units.memoized'):
+            enablement = get_enabled_units(course_key, [unit_keys[0], unit_keys[2]])
+
+        self.assertEqual(enablement, {'enabled': True, 'units': {str(unit_keys[0]): False}})
+
+    @patch('ai_aside.config_api.api.summaries_configuration_enabled')
+    def test_get_enabled_units_without_course_settings(self, mock_enabled):
+        mock_enabled.return_value = True
+        AIAsideUnitEnabled.objects.create(course_key=course_keys[0], unit_key=unit_keys[0], enabled=True)
+
+        self.assertEqual(get_enabled_units(course_keys[0]), {
+            'enabled': False,
+            'units': {str(unit_keys[0]): True},
+        })
+
+        with override_settings(SUMMARY_ENABLED_BY_DEFAULT=True):
+            self.assertEqual(get_enabled_units(course_keys[1], unit_keys), {'enabled': True, 'units': {}})
+
+    @patch('ai_aside.config_api.api.summaries_configuration_enabled')
+    def test_get_enabled_units_disabled_feature_flag(self, mock_enabled):
+        mock_enabled.return_value = False
+        AIAsideCourseEnabled.objects.create(course_key=course_keys[0], enabled=True)
+        AIAsideUnitEnabled.objects.create(course_key=course_keys[0], unit_key=unit_keys[0], enabled=True)
+
+        with self.assertQueryBudget('get_enabled_units.flag_disabled'):
+            self.assertEqual(get_enabled_units(course_keys[0]), {'enabled': False, 'units': {}})
+
+    @patch('ai_aside.config_api.api.summaries_configuration_enabled')
+    def test_is_summary_enabled_many_units(self, mock_enabled):
+        mock_enabled.return_value = True
+        course_key = course_keys[0]
+
+        AIAsideCourseEnabled.objects.create(course_key=course_key, enabled=True)
+        AIAsideUnitEnabled.objects.create(course_key=course_key, unit_key=unit_keys[1], enabled=False)
+
+        with self.assertQueryBudget('is_summary_enabled'):
+            enabled = [is_summary_enabled(course_key, unit_key) for unit_key in unit_keys]
+
+        self.assertEqual(enabled, [True, False, True])
+
+    @patch('ai_aside.config_api.api.summaries_configuration_enabled')
+    def test_is_summary_enabled_query_budget(self, mock_enabled):
+        mock_enabled.return_value = True
+        course_key = course_keys[0]
+        many_unit_keys = [course_key.make_usage_key('vertical', f'vertical{index}') for index in range(100)]
+
+        AIAsideCourseEnabled.objects.create(course_key=course_key, enabled=True)
+        for unit_key in many_unit_keys[::2]:
+            AIAsideUnitEnabled.objects.create(course_key=course_key, unit_key=unit_key, enabled=False)
+
+        with self.assertQueryBudget('is_summary_enabled'):
+            enabled = [is_summary_enabled(course_key, unit_key) for unit_key in many_unit_keys]
+        with self.assertQueryBudget('is_summary_enabled.memoized'):
+            enabled_again = [is_summary_enabled(course_key, unit_key) for unit_key in many_unit_keys]
+
+        self.assertEqual(enabled, [index % 2 == 1 for index in range(100)])
+        self.assertEqual(enabled_again, enabled)
+
     def test_is_summary_enabled_disabled_feature_flag_default_false(self):
         course_key_true = course_keys[0]
         course_key_false = course_keys[1]
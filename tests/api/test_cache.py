@@ -0,0 +1,141 @@
+"""
+Tests for the course enablement cache
+"""
+from unittest.mock import patch
+
+import ddt
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from edx_django_utils.cache import RequestCache
+from opaque_keys.edx.keys import CourseKey, UsageKey
+
+from ai_aside.config_api.api import (
+    delete_course_settings,
+    delete_unit_settings,
+    is_summary_enabled,
+    reset_course_unit_settings,
+    set_course_settings,
+    set_unit_settings,
+)
+from ai_aside.config_api.cache import bump_course_version, clear_local_cache, get_course_snapshot, get_course_version
+
+course_key = CourseKey.from_string('course-v1:edX+DemoX+Demo_Course')
+other_course_key = CourseKey.from_string('course-v1:edX+DemoX+Demo_Course-2')
+unit_key = UsageKey.from_string('block-v1:edX+DemoX+Demo_Course+type@vertical+block@vertical_0270f6de40fc')
+
+
+@ddt.ddt
+@override_settings(SUMMARY_ENABLED_BY_DEFAULT=False)
+@patch('ai_aside.config_api.api.summaries_configuration_enabled', lambda course_key: True)
+class TestEnablementCache(TestCase):
+    """Course enablement cache tests"""
+    def setUp(self):
+        super().setUp()
+        set_course_settings(course_key, {'enabled': True})
+        set_unit_settings(course_key, unit_key, {'enabled': False})
+
+    def test_snapshot(self):
+        with self.assertNumQueries(2):
+            snapshot = get_course_snapshot(course_key)
+
+        self.assertEqual(snapshot['enabled'], True)
+        self.assertEqual(snapshot['units'], {str(unit_key): False})
+        self.assertEqual(snapshot['version'], get_course_version(course_key))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_course_snapshot(course_key), snapshot)
+
+    def test_snapshot_course_without_settings(self):
+        snapshot = get_course_snapshot(other_course_key)
+
+        self.assertIsNone(snapshot['enabled'])
+        self.assertEqual(snapshot['units'], {})
+
+    def test_read_path_across_requests(self):
+        self.assertFalse(is_summary_enabled(course_key, unit_key))
+        RequestCache.clear_all_namespaces()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(is_summary_enabled(course_key, unit_key))
+            self.assertTrue(is_summary_enabled(course_key))
+
+    def test_local_cache(self):
+        snapshot = get_course_snapshot(course_key)
+        cache.clear()
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_course_snapshot(course_key), snapshot)
+
+    @override_settings(SUMMARY_ENABLEMENT_LOCAL_CACHE_TTL=0)
+    def test_local_cache_disabled(self):
+        get_course_snapshot(course_key)
+        cache.clear()
+
+        with self.assertNumQueries(2):
+            get_course_snapshot(course_key)
+
+    def test_local_cache_expired_same_version(self):
+        with patch('ai_aside.config_api.cache.time.monotonic', return_value=1000):
+            snapshot = get_course_snapshot(course_key)
+        cache.delete(f'ai_aside.enablement.{course_key}.snapshot')
+
+        with patch('ai_aside.config_api.cache.time.monotonic', return_value=1011):
+            with self.assertNumQueries(0):
+                self.assertIs(get_course_snapshot(course_key), snapshot)
+
+    def test_local_cache_expired_new_version(self):
+        with patch('ai_aside.config_api.cache.time.monotonic', return_value=1000):
+            snapshot = get_course_snapshot(course_key)
+        # another process writes to the course
+        cache.incr(f'ai_aside.enablement.{course_key}.version')
+
+        with patch('ai_aside.config_api.cache.time.monotonic', return_value=1005):
+            self.assertIs(get_course_snapshot(course_key), snapshot)
+
+        with patch('ai_aside.config_api.cache.time.monotonic', return_value=1011):
+            with self.assertNumQueries(2):
+                self.assertEqual(get_course_snapshot(course_key)['version'], snapshot['version'] + 1)
+
+    @override_settings(SUMMARY_ENABLEMENT_LOCAL_CACHE_MAX_ENTRIES=1)
+    def test_local_cache_bounded(self):
+        get_course_snapshot(course_key)
+        get_course_snapshot(other_course_key)
+        cache.clear()
+
+        with self.assertNumQueries(2):
+            get_course_snapshot(course_key)
+
+    def test_bump_course_version(self):
+        snapshot = get_course_snapshot(course_key)
+
+        bump_course_version(course_key)
+
+        self.assertNotEqual(get_course_version(course_key), snapshot['version'])
+        self.assertEqual(get_course_version(other_course_key), get_course_version(other_course_key))
+
+    def test_evicted_version(self):
+        snapshot = get_course_snapshot(course_key)
+        cache.delete(f'ai_aside.enablement.{course_key}.version')
+        clear_local_cache()
+
+        with self.assertNumQueries(2):
+            rebuilt = get_course_snapshot(course_key)
+
+        self.assertNotEqual(rebuilt['version'], snapshot['version'])
+
+    @ddt.data(
+        (lambda: set_course_settings(course_key, {'enabled': False}), False, False),
+        (lambda: set_unit_settings(course_key, unit_key, {'enabled': True}), True, True),
+        (lambda: delete_unit_settings(course_key, unit_key), True, True),
+        (lambda: reset_course_unit_settings(course_key), True, True),
+        (lambda: delete_course_settings(course_key), False, False),
+    )
+    @ddt.unpack
+    def test_setters_invalidate(self, write, course_enabled, unit_enabled):
+        get_course_snapshot(course_key)
+        RequestCache.clear_all_namespaces()
+
+        write()
+
+        self.assertEqual(is_summary_enabled(course_key), course_enabled)
+        self.assertEqual(is_summary_enabled(course_key, unit_key), unit_enabled)
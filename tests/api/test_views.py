@@ -4,11 +4,13 @@ Tests for the API
 from unittest.mock import Mock, patch
 
 import ddt
+from django.test import override_settings
 from django.urls import reverse
 from opaque_keys.edx.keys import CourseKey, UsageKey
 
 from ai_aside.models import AIAsideCourseEnabled, AIAsideUnitEnabled
 from test_utils import AIAsideAPITestCase
+from test_utils.query_budget import QueryBudgetMixin
 
 course_keys = [
     'course-v1:edX+DemoX+Demo_Course',
@@ -227,6 +229,114 @@ class TestApiViewsWithPermissions(AIAsideAPITestCase):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(message, 'this:is:not_a-valid~key#either! is not a valid UsageKey')
 
+    def test_units_enabled_setter_valid(self):
+        course_id = course_keys[0]
+
+        AIAsideUnitEnabled.objects.create(
+            course_key=CourseKey.from_string(course_id),
+            unit_key=UsageKey.from_string(unit_keys[0]),
+            enabled=True,
+        )
+
+        api_url = reverse('api-units-settings', kwargs={'course_id': course_id})
+        response = self.client.post(api_url, [
+            {'unit_id': unit_keys[0], 'enabled': False},
+            {'unit_id': unit_keys[1], 'enabled': True},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['response']['success'], True)
+
+        res = AIAsideUnitEnabled.objects.filter(course_key=course_id)
+
+        self.assertEqual(res.count(), 2)
+        self.assertFalse(res.get(unit_key=unit_keys[0]).enabled)
+        self.assertTrue(res.get(unit_key=unit_keys[1]).enabled)
+
+    @ddt.data(
+        {'unit_id': unit_keys[0], 'enabled': True},
+        [{'unit_id': unit_keys[0], 'enabled': 'True'}],
+        [{'unit_id': unit_keys[0]}],
+        [{'enabled': True}],
+        [unit_keys[0]],
+    )
+    def test_units_enabled_setter_invalid_parameters(self, payload):
+        course_id = course_keys[0]
+
+        api_url = reverse('api-units-settings', kwargs={'course_id': course_id})
+        response = self.client.post(api_url, payload, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['response']['message'], 'Invalid parameters')
+
+        res = AIAsideUnitEnabled.objects.filter(course_key=course_id)
+
+        self.assertEqual(res.count(), 0)
+
+    def test_units_enabled_setter_invalid_key(self):
+        course_id = course_keys[0]
+
+        api_url = reverse('api-units-settings', kwargs={'course_id': course_id})
+        response = self.client.post(api_url, [
+            {'unit_id': unit_keys[0], 'enabled': True},
+            {'unit_id': 'this:is:not_a-valid~key#either!', 'enabled': True},
+        ], format='json')
+
+        message = response.data['response']['message']
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(message, 'this:is:not_a-valid~key#either! is not a valid UsageKey')
+        self.assertEqual(AIAsideUnitEnabled.objects.filter(course_key=course_id).count(), 0)
+
+    def test_units_enabled_getter_valid(self):
+        course_id = course_keys[0]
+
+        AIAsideCourseEnabled.objects.create(course_key=CourseKey.from_string(course_id), enabled=True)
+        for unit_id, enabled in zip(unit_keys, [False, True]):
+            AIAsideUnitEnabled.objects.create(
+                course_key=CourseKey.from_string(course_id),
+                unit_key=UsageKey.from_string(unit_id),
+                enabled=enabled,
+            )
+
+        api_url = reverse('api-units-settings', kwargs={'course_id': course_id})
+        response = self.client.get(api_url, {'page': 2, 'page_size': 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['response']['success'], True)
+        self.assertEqual(response.data['response']['enabled'], True)
+        self.assertEqual(response.data['response']['count'], 2)
+        self.assertEqual(response.data['response']['page'], 2)
+        self.assertEqual(response.data['response']['num_pages'], 2)
+        self.assertEqual(response.data['response']['units'], [{'unit_id': unit_keys[1], 'enabled': True}])
+
+    @override_settings(SUMMARY_ENABLED_BY_DEFAULT=False)
+    def test_units_enabled_getter_empty(self):
+        course_id = course_keys[0]
+
+        api_url = reverse('api-units-settings', kwargs={'course_id': course_id})
+        response = self.client.get(api_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['response']['enabled'], False)
+        self.assertEqual(response.data['response']['count'], 0)
+        self.assertEqual(response.data['response']['num_pages'], 1)
+        self.assertEqual(response.data['response']['units'], [])
+
+    @ddt.data(
+        {'page': 'one'},
+        {'page': 0},
+        {'page_size': 0},
+        {'page_size': 1001},
+    )
+    def test_units_enabled_getter_invalid_parameters(self, params):
+        course_id = course_keys[0]
+
+        api_url = reverse('api-units-settings', kwargs={'course_id': course_id})
+        response = self.client.get(api_url, params)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['response']['message'], 'Invalid parameters')
+
     def test_unit_enabled_getter_valid(self):
         course_id = course_keys[0]
         unit_id = unit_keys[0]
@@ -333,6 +443,74 @@ class TestApiViewsWithPermissions(AIAsideAPITestCase):
         self.assertEqual(units.count(), 0)
 
 
+@ddt.ddt
+@patch('ai_aside.config_api.api.summaries_configuration_enabled', Mock(return_value=True))
+class TestApiViewsQueryBudgets(QueryBudgetMixin, AIAsideAPITestCase):
+    """API Endpoint View query budgets, on a course with many units"""
+    def setUp(self):
+        super().setUp()
+        can_change_summaries_settings.return_value = True
+        self.access_mock = patch('ai_aside.platform_imports.can_change_summaries_settings',
+                                 can_change_summaries_settings)
+        self.access_mock.start()
+
+        self.course_key = CourseKey.from_string(course_keys[0])
+        self.unit_ids = [str(self.course_key.make_usage_key('vertical', f'vertical{index}')) for index in range(50)]
+        AIAsideCourseEnabled.objects.create(course_key=self.course_key, enabled=True)
+        AIAsideUnitEnabled.objects.bulk_create([
+            AIAsideUnitEnabled(course_key=self.course_key, unit_key=UsageKey.from_string(unit_id), enabled=False)
+            for unit_id in self.unit_ids
+        ])
+
+    def tearDown(self):
+        super().tearDown()
+        self.access_mock.stop()
+
+    def request(self, call_path, method, url_name, data=None, **kwargs):
+        """Request a view within the query budget of its call path."""
+        api_url = reverse(url_name, kwargs={'course_id': course_keys[0], **kwargs})
+        with self.assertQueryBudget(call_path):
+            if data is None:
+                response = getattr(self.client, method)(api_url)
+            else:
+                response = getattr(self.client, method)(api_url, data, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_course_configurable(self):
+        self.request('views.course_configurable', 'get', 'api-course-configurable')
+
+    def test_course_settings(self):
+        self.request('views.course_settings.get', 'get', 'api-course-settings')
+        self.request('views.course_settings.post', 'post', 'api-course-settings', {'enabled': True})
+        self.request(
+            'views.course_settings.post.reset', 'post', 'api-course-settings', {'enabled': True, 'reset': True},
+        )
+
+        self.assertEqual(AIAsideUnitEnabled.objects.count(), 0)
+
+    def test_course_settings_delete(self):
+        self.request('views.course_settings.delete', 'delete', 'api-course-settings')
+
+    def test_unit_settings(self):
+        unit_id = self.unit_ids[0]
+
+        self.request('views.unit_settings.get', 'get', 'api-unit-settings', unit_id=unit_id)
+        self.request('views.unit_settings.post', 'post', 'api-unit-settings', {'enabled': True}, unit_id=unit_id)
+        self.request('views.unit_settings.delete', 'delete', 'api-unit-settings', unit_id=unit_id)
+
+    @ddt.data(1, 50)
+    def test_units_settings(self, count):
+        response = self.request('views.units_settings.get', 'get', 'api-units-settings')
+        self.assertEqual(len(response.data['response']['units']), 50)
+
+        self.request('views.units_settings.post', 'post', 'api-units-settings', [
+            {'unit_id': unit_id, 'enabled': True} for unit_id in self.unit_ids[:count]
+        ])
+        self.assertEqual(AIAsideUnitEnabled.objects.filter(enabled=True).count(), count)
+
+
 class TestApiViewsWithoutPermissions(AIAsideAPITestCase):
     """API Endpoint View tests without permissions"""
     def setUp(self):
@@ -402,6 +580,23 @@ class TestApiViewsWithoutPermissions(AIAsideAPITestCase):
 
         self.assertEqual(response.status_code, 403)
 
+    def test_get_units_settings_403(self):
+        course_id = course_keys[0]
+
+        api_url = reverse('api-units-settings', kwargs={'course_id': course_id})
+        response = self.client.get(api_url)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_post_units_settings_403(self):
+        course_id = course_keys[0]
+
+        api_url = reverse('api-units-settings', kwargs={'course_id': course_id})
+        response = self.client.post(api_url, [{'unit_id': unit_keys[0], 'enabled': True}], format='json')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(AIAsideUnitEnabled.objects.filter(course_key=course_id).count(), 0)
+
     def test_delete_unit_settings_403(self):
         course_id = course_keys[0]
         unit_id = unit_keys[0]
@@ -0,0 +1,12 @@
+"""Shared pytest fixtures."""
+import pytest
+
+from test_utils.caches import clear_caches as _clear_caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Keep cached content and settings from leaking between tests."""
+    _clear_caches()
+    yield
+    _clear_caches()
@@ -0,0 +1,173 @@
+"""
+Benchmarks of the summary aside hot paths.
+
+Units are built from fake blocks, and their size can be changed with the
+AI_ASIDE_BENCHMARK_HTML_CHILDREN, AI_ASIDE_BENCHMARK_HTML_KB and
+AI_ASIDE_BENCHMARK_VIDEOS environment variables, and the transcripts cleaned
+up with AI_ASIDE_BENCHMARK_TRANSCRIPT_CUES. Timings are printed, run
+with `pytest -s tests/test_benchmarks.py` to see them, and query counts are
+asserted so regressions fail the suite.
+"""
+import os
+import random
+import time
+from unittest.mock import Mock, patch
+
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from opaque_keys.edx.keys import CourseKey
+
+from ai_aside.block import _check_summarizable, _get_unit_children, _render_summary, summary_fragment
+from ai_aside.config_api.api import is_summary_enabled
+from ai_aside.models import AIAsideContentCache, AIAsideCourseEnabled, AIAsideUnitEnabled
+from ai_aside.text_utils import _WhitespaceNormalizer, cleanup_text, html_to_text
+from test_utils.blocks import fake_html, fake_transcript, make_aside, make_vertical
+from test_utils.caches import clear_caches
+from test_utils.text import html_chunks, realistic_html, regex_cleanup_text
+
+HTML_CHILDREN = int(os.environ.get('AI_ASIDE_BENCHMARK_HTML_CHILDREN', 10))
+HTML_KB = int(os.environ.get('AI_ASIDE_BENCHMARK_HTML_KB', 4))
+VIDEOS = int(os.environ.get('AI_ASIDE_BENCHMARK_VIDEOS', 3))
+ROUNDS = int(os.environ.get('AI_ASIDE_BENCHMARK_ROUNDS', 5))
+TRANSCRIPT_CUES = int(os.environ.get('AI_ASIDE_BENCHMARK_TRANSCRIPT_CUES', 2000))
+
+course_key = CourseKey.from_string('course-v1:edX+A+B')
+
+
+def benchmark(name, func, setup=None, rounds=ROUNDS):
+    """Run func a few times, calling setup before each run, print its timings and return its last result."""
+    timings = []
+    result = None
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+
+    print(f'{name}: min {min(timings) * 1e3:.2f}ms, mean {sum(timings) / len(timings) * 1e3:.2f}ms ({rounds} rounds)')
+    return result
+
+
+def clear_all_caches():
+    """Start from empty caches, including the database tier of the content cache."""
+    clear_caches()
+    AIAsideContentCache.objects.all().delete()
+
+
+@override_settings(
+    SUMMARY_HOOK_MIN_SIZE=500,
+    SUMMARY_HOOK_HOST='http://hookhost',
+    SUMMARY_HOOK_JS_PATH='/jspath',
+    SUMMARY_ENABLED_BY_DEFAULT=False,
+    AISPOT_LMS_NAME='',
+    HTML_TAGS_TO_REMOVE=['script', 'style'],
+)
+@patch('ai_aside.block.get_text_transcript', Mock(return_value=(fake_transcript + ' ') * 200))
+@patch('ai_aside.block.ff_is_summary_config_enabled', Mock(return_value=True))
+@patch('ai_aside.config_api.api.summaries_configuration_enabled', Mock(return_value=True))
+class TestBenchmarks(TestCase):
+    """Hot path benchmarks"""
+    def setUp(self):
+        self.block = make_vertical(HTML_CHILDREN, HTML_KB, VIDEOS, course_key.make_usage_key('vertical', 'vertical0'))
+        AIAsideCourseEnabled.objects.create(course_key=course_key, enabled=True)
+
+    def test_check_summarizable(self):
+        summarizable = benchmark(
+            'check_summarizable',
+            lambda: _check_summarizable(_get_unit_children(self.block)),
+        )
+
+        self.assertTrue(summarizable)
+
+    def test_render_summary(self):
+        context = {
+            'data_url_api': 'http://hookhost',
+            'data_course_id': str(course_key),
+            'data_content_id': str(self.block.scope_ids.usage_id),
+            'data_handler_url': 'http://handler.url',
+            'data_last_updated': '2023-06-07T08:09:10+00:00',
+            'data_user_role': 'student audit',
+            'data_client_id': 'edx-unit-summaries',
+            'js_url': 'http://hookhost/jspath',
+        }
+
+        benchmark('summary hook render compiling', lambda: Template(summary_fragment).render(Context(context)))
+        html = benchmark('summary hook render cached', lambda: _render_summary(context))
+
+        self.assertIn('launch-summary-button', html)
+
+    def test_html_to_text(self):
+        html = fake_html(HTML_KB)
+
+        text = benchmark(f'html_to_text {HTML_KB}KB', lambda: html_to_text(html))
+
+        self.assertTrue(text.startswith('Lorem ipsum'))
+
+    def test_normalize_whitespace(self):
+        chunks = html_chunks(realistic_html())
+
+        def normalize_streamed():
+            normalizer = _WhitespaceNormalizer()
+            for chunk in chunks:
+                normalizer.feed(chunk)
+            return normalizer.get_text()
+
+        joined = benchmark('html to text whitespace joined', lambda: regex_cleanup_text(''.join(chunks)))
+        streamed = benchmark('html to text whitespace streamed', normalize_streamed)
+
+        self.assertEqual(streamed, joined)
+
+    def test_cleanup_text(self):
+        rng = random.Random(3)
+        words = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit']
+        cues = [
+            f'{index}\n00:00:{index % 60:02d},000 --> 00:00:{index % 60:02d},500\n'
+            f'{" ".join(rng.choice(words) for _ in range(8))}  \n'
+            for index in range(TRANSCRIPT_CUES)
+        ]
+        transcript = '\n'.join(cues)
+
+        size = f'{len(transcript) / 1e3:.0f}KB'
+        regex = benchmark(f'cleanup_text {size} regex', lambda: regex_cleanup_text(transcript))
+        fused = benchmark(f'cleanup_text {size} fused', lambda: cleanup_text(transcript))
+
+        self.assertEqual(fused, regex)
+
+    def test_student_view_aside(self):
+        aside = make_aside(self.block)
+
+        benchmark('student_view_aside cold', lambda: aside.student_view_aside(self.block), setup=clear_all_caches)
+        aside.student_view_aside(self.block)
+
+        with self.assertNumQueries(0):
+            fragment = benchmark('student_view_aside warm', lambda: aside.student_view_aside(self.block))
+        self.assertIn('summary-hook', fragment.body_html())
+
+    def test_summary_handler(self):
+        aside = make_aside(self.block)
+
+        with patch('ai_aside.block.get_block', Mock(return_value=self.block)):
+            benchmark('summary_handler cold', aside.summary_handler, setup=clear_all_caches)
+            aside.summary_handler()
+
+            with self.assertNumQueries(0):
+                response = benchmark('summary_handler warm', aside.summary_handler)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['data']), HTML_CHILDREN + VIDEOS)
+
+    def test_is_summary_enabled(self):
+        unit_keys = [course_key.make_usage_key('vertical', f'vertical{index}') for index in range(100)]
+        AIAsideUnitEnabled.objects.create(course_key=course_key, unit_key=unit_keys[0], enabled=False)
+
+        def check_units():
+            return [is_summary_enabled(course_key, unit_key) for unit_key in unit_keys]
+
+        clear_all_caches()
+        with self.assertNumQueries(2):
+            enabled = check_units()
+        with self.assertNumQueries(0):
+            benchmark('is_summary_enabled 100 units', check_units)
+
+        self.assertEqual(enabled, [False] + [True] * 99)
@@ -1,72 +1,58 @@
 """Tests for the block."""
+import gzip
+import json
+import threading
+import time
 import unittest
-from datetime import datetime
 from textwrap import dedent
 from unittest.mock import MagicMock, Mock, call, patch
 
-import pytz
+from django.template import Context, Template
 from django.test import TestCase, override_settings
-from opaque_keys.edx.keys import UsageKey
+from opaque_keys.edx.keys import CourseKey
+from webob import Request
 
 from ai_aside.block import (
     SummaryHookAside,
     _check_summarizable,
     _extract_child_contents,
     _format_date,
+    _get_unit_children,
     _parse_children_contents,
+    _peek_children_contents,
     _render_hook_fragment,
+    _render_summary,
+    summary_fragment,
 )
+from ai_aside.content_cache import content_hash, lookup_child_contents, store_transcript
+from ai_aside.models import AIAsideCourseEnabled, AIAsideUnitEnabled
+from ai_aside.summary_index import save_course_index
+from test_utils.blocks import (
+    FakeBlock,
+    FakeChild,
+    date1,
+    date2,
+    fake_get_transcript,
+    fake_transcript,
+    make_aside,
+    make_vertical,
+)
+from test_utils.query_budget import QueryBudgetMixin
 
-fake_transcript = 'This is the text version from the transcript'
-date1 = datetime(2023, 1, 2, 3, 4, 5, 0, pytz.UTC)
-date2 = datetime(2023, 6, 7, 8, 9, 10, 0, pytz.UTC)
-
-
-def fake_get_transcript(child, lang=None, output_format='SRT', youtube_id=None):  # pylint: disable=unused-argument
-    return (fake_transcript, 'unused', 'unused')
-
-
-class FakeChild:
-    """Fake child block for testing"""
-    transcript_download_format = 'txt'
-
-    def __init__(self, category, test_id='test-id', test_html='<div>This is a test</div>'):
-        self.category = category
-        self.published_on = 'published-on-{}'.format(test_id)
-        self.edited_on = 'edited-on-{}'.format(test_id)
-        self.scope_ids = lambda: None
-        self.scope_ids.def_id = 'def-id-{}'.format(test_id)
-        self.html = test_html
-        self.transcript = fake_transcript
-
-    def get_html(self):
-        if self.category == 'html':
-            return self.html
-
-        return None
-
-
-class FakeBlock:
-    "Fake block for testing, returns given children"
-    def __init__(self, children):
-        self.children = children
-        self.scope_ids = lambda: None
-        self.scope_ids.usage_id = UsageKey.from_string('block-v1:edX+A+B+type@vertical+block@verticalD')
-        self.edited_on = date1
-        self.published_on = date1
-        my_runtime = MagicMock()
-        my_runtime.service.return_value.get_current_user.return_value.opt_attrs.get.return_value = "student audit"
-        self.runtime = my_runtime
 
-    def get_children(self):
-        return self.children
+def with_content_hashes(items):
+    """Add the hash of their text to the expected items that have one."""
+    return [
+        {**item, 'content_hash': content_hash(item['content_text'])} if 'content_text' in item else item
+        for item in items
+    ]
 
 
 @override_settings(SUMMARY_HOOK_MIN_SIZE=40,
                    SUMMARY_HOOK_HOST='http://hookhost',
                    SUMMARY_HOOK_JS_PATH='/jspath',
                    HTML_TAGS_TO_REMOVE=['script', 'style', 'test'])
-class TestSummaryHookAside(TestCase):
+class TestSummaryHookAside(QueryBudgetMixin, TestCase):
     """Summary hook aside tests"""
     def setUp(self):
         transcript_utils_mock = MagicMock()
@@ -131,7 +117,7 @@ class TestSummaryHookAside(TestCase):
         ]
         block = FakeBlock(children)
 
-        content = _check_summarizable(block)
+        content = _check_summarizable(_get_unit_children(block))
 
         self.assertTrue(content)
 
@@ -142,7 +128,7 @@ class TestSummaryHookAside(TestCase):
         ]
         block = FakeBlock(children)
 
-        content = _check_summarizable(block)
+        content = _check_summarizable(_get_unit_children(block))
 
         self.assertFalse(content)
 
@@ -194,7 +180,7 @@ class TestSummaryHookAside(TestCase):
         length, items = _parse_children_contents(block)
 
         self.assertEqual(length, expected_length)
-        self.assertEqual(items, expected_items)
+        self.assertEqual(items, with_content_hashes(expected_items))
 
     def test_parse_children_contents_with_valid_children_2(self):
         children = [
@@ -229,7 +215,7 @@ class TestSummaryHookAside(TestCase):
 
         length, items = _parse_children_contents(block)
         self.assertEqual(length, expected_length)
-        self.assertEqual(items, expected_items)
+        self.assertEqual(items, with_content_hashes(expected_items))
 
     def test_parse_children_contents_with_script_or_style_tags(self):
         children = [
@@ -275,7 +261,409 @@ class TestSummaryHookAside(TestCase):
         length, items = _parse_children_contents(block)
 
         self.assertEqual(length, expected_length)
-        self.assertEqual(items, expected_items)
+        self.assertEqual(items, with_content_hashes(expected_items))
+
+    def test_parse_children_contents_uses_content_cache(self):
+        child = FakeChild('html', '01', '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>')
+        child.get_html = Mock(return_value=child.html)
+        block = FakeBlock([child])
+
+        first = _parse_children_contents(block)
+        second = _parse_children_contents(block)
+
+        self.assertEqual(first, second)
+        # the raw html is fetched once per render and extracted only on the first one
+        self.assertEqual(child.get_html.call_count, 2)
+
+    def test_parse_children_contents_caches_transcripts_apart(self):
+        video = FakeChild('video', '01')
+        block = FakeBlock([video])
+
+        with patch('ai_aside.block.get_text_transcript', Mock(return_value='First transcript')):
+            _parse_children_contents(block)
+
+        # a transcript replaced without editing the video is seen once the transcript cache has it
+        self.assertEqual(lookup_child_contents(video), (False, None, None))
+        store_transcript(video, 'Replaced transcript')
+        _, items = _parse_children_contents(block)
+        self.assertEqual(items[0]['content_text'], 'Replaced transcript')
+
+    def test_parse_children_contents_warm_no_queries(self):
+        children = [FakeChild('problem', f'0{index}') for index in range(5)]
+        children.append(FakeChild('html', '05', '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>'))
+        block = FakeBlock(children)
+        _parse_children_contents(block)
+
+        with self.assertNumQueries(0):
+            _parse_children_contents(block)
+        with self.assertNumQueries(0):
+            _parse_children_contents(block, min_length=40)
+
+    def test_parse_children_contents_fetches_once(self):
+        children = [
+            FakeChild('html', '01', '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>'),
+            FakeChild('video', '02'),
+        ]
+        children[0].get_html = Mock(return_value=children[0].html)
+        block = FakeBlock(children)
+        block.get_children = Mock(return_value=children)
+
+        _parse_children_contents(block)
+
+        block.get_children.assert_called_once()
+        children[0].get_html.assert_called_once()
+
+    def test_parse_children_contents_with_min_length(self):
+        children = [
+            FakeChild('html', '01', '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>'),
+            FakeChild('video', '02'),
+            FakeChild('unknown', '03'),
+        ]
+        block = FakeBlock(children)
+
+        with patch('ai_aside.block.get_text_transcript') as mock_transcript:
+            length, items = _parse_children_contents(block, min_length=40)
+
+        mock_transcript.assert_not_called()
+        self.assertEqual(length, 56)
+        self.assertEqual(items, with_content_hashes([{
+            'definition_id': 'def-id-01',
+            'content_type': 'TEXT',
+            'content_text': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit.',
+            'published_on': 'published-on-01',
+            'edited_on': 'edited-on-01',
+        }, {
+            'definition_id': 'def-id-02',
+            'content_type': 'VIDEO',
+            'published_on': 'published-on-02',
+            'edited_on': 'edited-on-02',
+        }]))
+
+    @override_settings(SUMMARY_CHILD_CONTENT_WORKERS=4)
+    def test_parse_children_contents_concurrently(self):
+        children = [FakeChild('video', f'0{index}') for index in range(4)]
+        children.insert(2, FakeChild('html', '04', '<p>Lorem ipsum dolor sit amet.</p>'))
+        block = FakeBlock(children)
+
+        def slow_transcript(child):
+            time.sleep(0.2)
+            return f'Transcript of {child.scope_ids.def_id}'
+
+        with patch('ai_aside.block.get_text_transcript', Mock(side_effect=slow_transcript)) as mock_transcript:
+            started = time.monotonic()
+            length, items = _parse_children_contents(block)
+            elapsed = time.monotonic() - started
+
+            self.assertLess(elapsed, 0.6)
+            self.assertEqual([item['content_text'] for item in items], [
+                'Transcript of def-id-00',
+                'Transcript of def-id-01',
+                'Lorem ipsum dolor sit amet.',
+                'Transcript of def-id-02',
+                'Transcript of def-id-03',
+            ])
+            self.assertEqual(length, sum(len(item['content_text']) for item in items))
+
+            # the transcripts are cached by the request thread
+            self.assertEqual(_parse_children_contents(block), (length, items))
+            self.assertEqual(mock_transcript.call_count, 4)
+
+    @override_settings(SUMMARY_CHILD_CONTENT_WORKERS=2, SUMMARY_CHILD_CONTENT_TIMEOUT=0.1)
+    def test_parse_children_contents_concurrently_timeout(self):
+        children = [FakeChild('video', '01'), FakeChild('video', '02')]
+        block = FakeBlock(children)
+        release = threading.Event()
+
+        def transcript(child):
+            if child is children[0]:
+                release.wait(5)
+            return f'Transcript of {child.scope_ids.def_id}'
+
+        with patch('ai_aside.block.get_text_transcript', Mock(side_effect=transcript)) as mock_transcript:
+            try:
+                _, items = _parse_children_contents(block)
+            finally:
+                release.set()
+
+            self.assertEqual([item['definition_id'] for item in items], ['def-id-02'])
+
+            # the timed out child is not cached, so it is extracted again
+            _, items = _parse_children_contents(block)
+            self.assertEqual([item['definition_id'] for item in items], ['def-id-01', 'def-id-02'])
+            self.assertEqual(mock_transcript.call_count, 3)
+
+    def test_peek_children_contents(self):
+        children = [
+            FakeChild('html', '01', '<p>Short</p>'),
+            FakeChild('video', '02'),
+            FakeChild('unknown', '03'),
+        ]
+        block = FakeBlock(children)
+
+        with patch('ai_aside.block.get_text_transcript') as mock_transcript:
+            summarizable, items = _peek_children_contents(block)
+
+        mock_transcript.assert_not_called()
+        self.assertTrue(summarizable)
+        self.assertEqual(items, [{
+            'definition_id': 'def-id-01',
+            'content_type': 'TEXT',
+            'published_on': 'published-on-01',
+            'edited_on': 'edited-on-01',
+        }, {
+            'definition_id': 'def-id-02',
+            'content_type': 'VIDEO',
+            'published_on': 'published-on-02',
+            'edited_on': 'edited-on-02',
+        }])
+
+        summarizable, items = _peek_children_contents(FakeBlock([FakeChild('html', '01', '<p>Short</p>')]))
+        self.assertFalse(summarizable)
+        self.assertEqual(items, [])
+
+    @override_settings(SUMMARY_HOOK_LAZY=True)
+    def test_student_view_lazy(self):
+        # pylint: disable=protected-access
+        aside = Mock()
+        aside._user_role_string.return_value = 'student audit'
+        aside._summary_handler_url.return_value = 'http://handler.url'
+        child = FakeChild('video', '01')
+        child.published_on = date1
+        child.edited_on = date2
+        block = FakeBlock([child])
+
+        with patch('ai_aside.block.get_text_transcript') as mock_transcript:
+            fragment = SummaryHookAside._student_view_can_throw(aside, block)
+
+        mock_transcript.assert_not_called()
+        self.assertIn('data-last-updated="2023-06-07T08:09:10+00:00"', fragment.body_html())
+
+    @override_settings(SUMMARY_HOOK_LAZY=True)
+    def test_student_view_lazy_not_summarizable(self):
+        block = FakeBlock([FakeChild('html', '01', '<p>Short</p>')])
+
+        fragment = SummaryHookAside._student_view_can_throw(Mock(), block)  # pylint: disable=protected-access
+
+        self.assertEqual(fragment.body_html(), '')
+
+    def test_student_view_remembers_not_summarizable(self):
+        # pylint: disable=protected-access
+        child = FakeChild('html', '01', '<p>Short</p>')
+        child.published_on = child.edited_on = date1
+        block = FakeBlock([child])
+        block.get_children = Mock(return_value=block.children)
+
+        self.assertEqual(SummaryHookAside._student_view_can_throw(Mock(), block).body_html(), '')
+        self.assertEqual(SummaryHookAside._student_view_can_throw(Mock(), block).body_html(), '')
+        block.get_children.assert_called_once()
+
+        block.edited_on = date2
+        self.assertEqual(SummaryHookAside._student_view_can_throw(Mock(), block).body_html(), '')
+        self.assertEqual(block.get_children.call_count, 2)
+
+        with override_settings(SUMMARY_HOOK_MIN_SIZE=5):
+            SummaryHookAside._student_view_can_throw(Mock(), block)
+        self.assertEqual(block.get_children.call_count, 3)
+
+    @override_settings(SUMMARY_INDEX_ENABLED=True)
+    def test_student_view_from_summary_index(self):
+        # pylint: disable=protected-access
+        aside = Mock()
+        aside._user_role_string.return_value = 'student audit'
+        aside._summary_handler_url.return_value = 'http://handler.url'
+        block = FakeBlock([FakeChild('html', '01', '<p>Short</p>')])
+        block.get_children = Mock(return_value=block.children)
+        usage_id = block.scope_ids.usage_id
+        save_course_index(usage_id.course_key, {
+            usage_id: {'content_length': 1000, 'item_count': 2, 'last_updated': date2},
+        })
+
+        fragment = SummaryHookAside._student_view_can_throw(aside, block)
+
+        block.get_children.assert_not_called()
+        self.assertIn('data-last-updated="2023-06-07T08:09:10+00:00"', fragment.body_html())
+
+        save_course_index(usage_id.course_key, {
+            usage_id: {'content_length': 10, 'item_count': 1, 'last_updated': date2},
+        })
+
+        block.children[0].get_html = Mock(return_value=block.children[0].html)
+        self.assertEqual(SummaryHookAside._student_view_can_throw(aside, block).body_html(), '')
+        # the children are only fetched to look for videos
+        block.get_children.assert_called_once()
+        block.children[0].get_html.assert_not_called()
+
+    @override_settings(SUMMARY_INDEX_ENABLED=True)
+    def test_student_view_rechecks_indexed_videos(self):
+        # pylint: disable=protected-access
+        aside = Mock()
+        aside._user_role_string.return_value = 'student audit'
+        aside._summary_handler_url.return_value = 'http://handler.url'
+        block = make_vertical(videos=1)
+        block.get_children = Mock(return_value=block.children)
+        usage_id = block.scope_ids.usage_id
+        save_course_index(usage_id.course_key, {
+            usage_id: {'content_length': 0, 'item_count': 0, 'last_updated': date2},
+        })
+
+        # the transcript reached edxval after the unit was indexed
+        fragment = SummaryHookAside._student_view_can_throw(aside, block)
+
+        block.get_children.assert_called_once()
+        self.assertIn('summary-hook', fragment.body_html())
+
+        # and when it is still missing, the decision is remembered like for unindexed units
+        store_transcript(block.children[0], None)
+        self.assertEqual(SummaryHookAside._student_view_can_throw(aside, block).body_html(), '')
+        self.assertEqual(SummaryHookAside._student_view_can_throw(aside, block).body_html(), '')
+        self.assertEqual(block.get_children.call_count, 2)
+
+    @override_settings(SUMMARY_INDEX_ENABLED=True)
+    def test_student_view_ignores_outdated_summary_index(self):
+        # pylint: disable=protected-access
+        block = FakeBlock([FakeChild('html', '01', '<p>Short</p>')])
+        block.get_children = Mock(return_value=block.children)
+        block.published_on = date2
+        usage_id = block.scope_ids.usage_id
+        save_course_index(usage_id.course_key, {
+            usage_id: {'content_length': 1000, 'item_count': 2, 'last_updated': date1},
+        })
+
+        self.assertEqual(SummaryHookAside._student_view_can_throw(Mock(), block).body_html(), '')
+        block.get_children.assert_called_once()
+
+    @patch('ai_aside.block.ff_summary_staff_only', Mock(return_value=True))
+    def test_summary_handler_etag(self):
+        block = make_vertical(html_children=2, html_kb=1)
+        aside = make_aside(block)
+
+        with patch('ai_aside.block.get_block', Mock(return_value=block)):
+            response = aside.summary_handler(Request.blank('/'))
+            etag = response.etag
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json['data']), 2)
+            self.assertTrue(etag)
+
+            with patch('ai_aside.block._parse_children_contents') as parse_children_contents:
+                response = aside.summary_handler(Request.blank('/', headers={'If-None-Match': f'"{etag}"'}))
+
+            parse_children_contents.assert_not_called()
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.etag, etag)
+            self.assertEqual(response.body, b'')
+
+            block.children[1].edited_on = date2
+            response = aside.summary_handler(Request.blank('/', headers={'If-None-Match': f'"{etag}"'}))
+
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.etag, etag)
+
+    @patch('ai_aside.block.ff_summary_staff_only', Mock(return_value=True))
+    def test_summary_handler_etag_transcripts(self):
+        block = make_vertical(html_children=1, html_kb=1, videos=1)
+        aside = make_aside(block)
+        video = block.children[1]
+
+        with patch('ai_aside.block.get_block', Mock(return_value=block)):
+            with patch('ai_aside.block.get_text_transcript', Mock(return_value=None)):
+                response = aside.summary_handler(Request.blank('/'))
+            # the transcript may reach edxval without the video being edited
+            self.assertIsNone(response.etag)
+            self.assertEqual(len(response.json['data']), 1)
+
+            store_transcript(video, 'First transcript')
+            etag = aside.summary_handler(Request.blank('/')).etag
+            self.assertTrue(etag)
+            response = aside.summary_handler(Request.blank('/', headers={'If-None-Match': f'"{etag}"'}))
+            self.assertEqual(response.status_code, 304)
+
+            store_transcript(video, 'Replaced transcript')
+            response = aside.summary_handler(Request.blank('/', headers={'If-None-Match': f'"{etag}"'}))
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.etag, etag)
+            self.assertEqual(response.json['data'][1]['content_text'], 'Replaced transcript')
+
+    @patch('ai_aside.block.ff_summary_staff_only', Mock(return_value=True))
+    def test_summary_handler_content_hashes(self):
+        block = make_vertical(html_children=2, html_kb=1)
+        aside = make_aside(block)
+
+        with patch('ai_aside.block.get_block', Mock(return_value=block)):
+            response = aside.summary_handler()
+            items = response.json['data']
+
+            self.assertEqual(items[0]['content_hash'], content_hash(items[0]['content_text']))
+            self.assertEqual(len(response.json['content_hash']), 64)
+
+            # editing without changing the text keeps the hashes
+            block.children[1].edited_on = date2
+            edited = aside.summary_handler()
+
+            self.assertNotEqual(edited.etag, response.etag)
+            self.assertEqual(edited.json['content_hash'], response.json['content_hash'])
+            self.assertEqual(
+                [item['content_hash'] for item in edited.json['data']],
+                [item['content_hash'] for item in items],
+            )
+
+            block.children[1].html = '<p>Different text</p>'
+            block.children[1].edited_on = date1.replace(year=2024)
+            changed = aside.summary_handler()
+
+            self.assertNotEqual(changed.json['content_hash'], response.json['content_hash'])
+            self.assertEqual(changed.json['data'][0]['content_hash'], items[0]['content_hash'])
+
+    @patch('ai_aside.block.ff_summary_staff_only', Mock(return_value=True))
+    def test_summary_handler_streaming(self):
+        block = make_vertical(html_children=2, html_kb=1, videos=1)
+        aside = make_aside(block)
+
+        with patch('ai_aside.block.get_block', Mock(return_value=block)):
+            expected = aside.summary_handler()
+
+            with override_settings(SUMMARY_HANDLER_STREAMING=True):
+                response = aside.summary_handler(Request.blank('/', headers={'Accept-Encoding': 'gzip'}))
+                plain = aside.summary_handler(Request.blank('/'))
+
+        self.assertEqual(response.content_encoding, 'gzip')
+        self.assertEqual(response.etag, f'{expected.etag}-gzip')
+        self.assertEqual(json.loads(gzip.decompress(b''.join(response.app_iter))), expected.json)
+        self.assertIsNone(plain.content_encoding)
+        self.assertEqual(plain.etag, expected.etag)
+        self.assertEqual(json.loads(b''.join(plain.app_iter)), expected.json)
+
+    @override_settings(SUMMARY_HANDLER_STREAMING=True)
+    @patch('ai_aside.block.ff_summary_staff_only', Mock(return_value=True))
+    def test_summary_handler_streaming_etag_per_encoding(self):
+        block = make_vertical(html_children=2, html_kb=1)
+        aside = make_aside(block)
+
+        def request(etag, encoding):
+            return Request.blank('/', headers={'If-None-Match': f'"{etag}"', 'Accept-Encoding': encoding})
+
+        with patch('ai_aside.block.get_block', Mock(return_value=block)):
+            etag = aside.summary_handler(Request.blank('/', headers={'Accept-Encoding': 'gzip'})).etag
+
+            self.assertEqual(aside.summary_handler(request(etag, 'gzip')).status_code, 304)
+            self.assertEqual(aside.summary_handler(request(etag, 'deflate')).status_code, 200)
+            self.assertEqual(aside.summary_handler(request(etag, 'identity')).status_code, 200)
+
+    @patch('ai_aside.block.ff_summary_staff_only', Mock(return_value=True))
+    def test_summary_handler_etag_not_summarizable(self):
+        block = FakeBlock([FakeChild('html', '01', '<p>Short</p>')])
+        aside = make_aside(block)
+
+        with patch('ai_aside.block.get_block', Mock(return_value=block)):
+            response = aside.summary_handler()
+            self.assertEqual(response.json, {'data': []})
+
+            response = aside.summary_handler(Request.blank('/', headers={'If-None-Match': f'"{response.etag}"'}))
+            self.assertEqual(response.status_code, 304)
+
+            with override_settings(SUMMARY_HOOK_MIN_SIZE=5):
+                response = aside.summary_handler(Request.blank('/', headers={'If-None-Match': f'"{response.etag}"'}))
+            self.assertEqual(response.status_code, 200)
 
     def test_parse_children_contents_with_invalid_children(self):
         children = [
@@ -344,6 +732,64 @@ class TestSummaryHookAside(TestCase):
             "".join(expected).split()
         )
 
+    def test_render_summary_cached_template(self):
+        context = {
+            'data_url_api': 'http://hookhost',
+            'data_course_id': 'course-v1:edX+A+B',
+            'data_content_id': 'block-v1:edX+A+B+type@vertical+block@verticalD',
+            'data_handler_url': 'http://handler.url',
+            'data_last_updated': '2023-06-07T08:09:10+00:00',
+            'data_user_role': 'student audit',
+            'data_client_id': 'edx-unit-summaries',
+            'js_url': 'http://hookhost/jspath',
+        }
+
+        self.assertEqual(_render_summary(context), Template(summary_fragment).render(Context(context)))
+
+    def test_render_summary_escapes(self):
+        html = _render_summary({'data_user_role': '"><script>alert(1)</script>'})
+
+        self.assertNotIn('<script>alert(1)</script>', html)
+        self.assertIn('data-user-role="&quot;&gt;&lt;script&gt;alert(1)&lt;/script&gt;"', html)
+
+    @override_settings(SUMMARY_INDEX_ENABLED=True)
+    @patch('ai_aside.block.ff_summary_staff_only', Mock(return_value=True))
+    def test_summary_handler_ignores_summary_index(self):
+        block = make_vertical(html_children=2, html_kb=1)
+        aside = make_aside(block)
+        usage_id = block.scope_ids.usage_id
+        save_course_index(usage_id.course_key, {
+            usage_id: {'content_length': 10, 'item_count': 0, 'last_updated': date2},
+        })
+
+        with patch('ai_aside.block.get_block', Mock(return_value=block)):
+            response = aside.summary_handler()
+
+        # the index only decides on the hook, ai-spot still gets the contents it asks for
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['data']), 2)
+
+    @override_settings(SUMMARY_ENABLED_BY_DEFAULT=False)
+    @patch('ai_aside.config_api.api.summaries_configuration_enabled', Mock(return_value=True))
+    @patch('ai_aside.block.ff_is_summary_config_enabled', Mock(return_value=True))
+    def test_should_apply_to_block_many_units(self):
+        course_key = CourseKey.from_string('course-v1:edX+A+B')
+        blocks = []
+        for index in range(10):
+            block = FakeBlock([], course_key.make_usage_key('vertical', f'vertical{index}'))
+            block.runtime.user_is_staff = False
+            blocks.append(block)
+        AIAsideCourseEnabled.objects.create(course_key=course_key, enabled=True)
+        AIAsideUnitEnabled.objects.create(course_key=course_key, unit_key=blocks[3].scope_ids.usage_id, enabled=False)
+
+        with self.assertQueryBudget('should_apply_to_block'):
+            applied = [SummaryHookAside.should_apply_to_block(block) for block in blocks]
+        with self.assertQueryBudget('should_apply_to_block.memoized'):
+            applied_again = [SummaryHookAside.should_apply_to_block(block) for block in blocks]
+
+        self.assertEqual(applied, [index != 3 for index in range(10)])
+        self.assertEqual(applied_again, applied)
+
     def test_user_role_from_services(self):
         user_service = Mock()
         credit_service = Mock()
@@ -460,7 +906,7 @@ class TestSummaryHookAsideMissingTranscript(TestCase):
         length, items = _parse_children_contents(block)
 
         self.assertEqual(length, expected_length)
-        self.assertEqual(items, expected_items)
+        self.assertEqual(items, with_content_hashes(expected_items))
 
 
 if __name__ == '__main__':
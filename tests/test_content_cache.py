@@ -0,0 +1,231 @@
+"""Tests for the content cache."""
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ai_aside.content_cache import (
+    ContentCache,
+    DatabaseBackend,
+    DjangoCacheBackend,
+    child_content_key,
+    content_hash,
+    get_cached_child_contents,
+    get_cached_transcript,
+    lookup_child_contents,
+    lookup_transcript,
+    transcript_key,
+)
+from ai_aside.models import AIAsideContentCache
+from test_utils.blocks import FakeChild
+
+
+def fake_video(**fields):
+    """Make a fake video block with a transcript, with fields overridden by keyword."""
+    return FakeChild('video', 'video1', **{
+        'edx_video_id': 'video-id',
+        'transcripts': {'en': 'transcript.srt'},
+        'youtube_id_1_0': 'youtube-id',
+        **fields,
+    })
+
+
+class TestContentCacheKey(TestCase):
+    """Content cache key tests"""
+    def test_key_changes_with_definition_and_dates(self):
+        key = child_content_key(FakeChild('html'))
+
+        self.assertTrue(key.startswith('ai_aside.content.'))
+        self.assertEqual(key, child_content_key(FakeChild('html')))
+        self.assertNotEqual(key, child_content_key(FakeChild('html', 'other')))
+        self.assertNotEqual(key, child_content_key(FakeChild('html', edited_on='edited-later')))
+        self.assertNotEqual(key, child_content_key(FakeChild('html', published_on='published-later')))
+
+    def test_key_changes_with_extraction(self):
+        key = child_content_key(FakeChild('html'))
+
+        with override_settings(HTML_TAGS_TO_REMOVE=['script', 'style', 'iframe']):
+            self.assertNotEqual(key, child_content_key(FakeChild('html')))
+        with patch('ai_aside.content_cache.CONTENT_EXTRACTION_VERSION', 0):
+            self.assertNotEqual(key, child_content_key(FakeChild('html')))
+
+    def test_key_for_learner_specific_html(self):
+        child = FakeChild('html', data='<a href="https://survey.example.com/?user=%%USER_ID%%">Survey</a>')
+        extract = Mock(return_value='Survey')
+
+        self.assertIsNone(child_content_key(child))
+        get_cached_child_contents(child, extract)
+        get_cached_child_contents(child, extract)
+        self.assertEqual(extract.call_count, 2)
+        self.assertEqual(AIAsideContentCache.objects.count(), 0)
+
+    def test_key_without_definition(self):
+        child = FakeChild('html')
+        child.scope_ids.def_id = None
+
+        self.assertIsNone(child_content_key(child))
+
+
+class TestContentCache(TestCase):
+    """Content cache tests"""
+    def test_get_cached_child_contents(self):
+        extract = Mock(return_value='Some text')
+        contents = ('Some text', content_hash('Some text'))
+
+        self.assertEqual(get_cached_child_contents(FakeChild('html'), extract), contents)
+        self.assertEqual(get_cached_child_contents(FakeChild('html'), extract), contents)
+        extract.assert_called_once()
+
+        self.assertEqual(get_cached_child_contents(FakeChild('html', edited_on='edited-later'), extract), contents)
+        self.assertEqual(extract.call_count, 2)
+
+    def test_get_cached_child_contents_none(self):
+        extract = Mock(return_value=None)
+
+        self.assertEqual(get_cached_child_contents(FakeChild('html'), extract), (None, None))
+        self.assertEqual(get_cached_child_contents(FakeChild('html'), extract), (None, None))
+        # missing contents are left to the transcript cache
+        self.assertEqual(extract.call_count, 2)
+
+    def test_get_cached_child_contents_uncacheable(self):
+        child = FakeChild('html')
+        child.scope_ids.def_id = None
+        extract = Mock(return_value='Some text')
+
+        get_cached_child_contents(child, extract)
+        get_cached_child_contents(child, extract)
+        self.assertEqual(extract.call_count, 2)
+
+    def test_database_fallback_refills_django_cache(self):
+        content_cache = ContentCache([DjangoCacheBackend(60), DatabaseBackend(60)])
+        content_cache.set('the-key', 'Some text', 'the-hash')
+        cache.clear()
+
+        self.assertEqual(content_cache.get('the-key'), (True, 'Some text', 'the-hash'))
+        self.assertEqual(DjangoCacheBackend(60).get('the-key'), (True, 'Some text', 'the-hash'))
+        self.assertEqual(content_cache.get('missing-key'), (False, None, None))
+
+    def test_content_hash(self):
+        self.assertEqual(content_hash('Some text'), content_hash('Some text'))
+        self.assertNotEqual(content_hash('Some text'), content_hash('Some other text'))
+        self.assertEqual(len(content_hash('')), 64)
+
+    def test_lookup_hashes_entries_cached_without_hash(self):
+        DjangoCacheBackend(60).set(child_content_key(FakeChild('html')), 'Some text')
+
+        self.assertEqual(lookup_child_contents(FakeChild('html')), (True, 'Some text', content_hash('Some text')))
+
+    @override_settings(SUMMARY_CONTENT_CACHE_BACKENDS=['ai_aside.content_cache.DatabaseBackend'])
+    def test_configured_backends(self):
+        get_cached_child_contents(FakeChild('html'), Mock(return_value='Some text'))
+
+        self.assertEqual(AIAsideContentCache.objects.count(), 1)
+        self.assertEqual(DjangoCacheBackend(60).get(child_content_key(FakeChild('html'))), (False, None, None))
+
+    @override_settings(SUMMARY_CONTENT_CACHE_BACKENDS=[])
+    def test_disabled(self):
+        extract = Mock(return_value='Some text')
+
+        get_cached_child_contents(FakeChild('html'), extract)
+        get_cached_child_contents(FakeChild('html'), extract)
+        self.assertEqual(extract.call_count, 2)
+
+
+class TestDatabaseBackend(TestCase):
+    """Database content cache backend tests"""
+    def test_expired_entry(self):
+        backend = DatabaseBackend(60)
+        backend.set('the-key', 'Some text')
+        AIAsideContentCache.objects.update(created=timezone.now() - timedelta(seconds=61))
+
+        self.assertEqual(backend.get('the-key'), (False, None, None))
+        self.assertEqual(AIAsideContentCache.objects.count(), 0)
+
+    @override_settings(SUMMARY_CONTENT_CACHE_MAX_ENTRIES=3, SUMMARY_CONTENT_CACHE_CULL_FREQUENCY=1)
+    def test_cull_least_recently_accessed(self):
+        backend = DatabaseBackend(60)
+        for index in range(3):
+            backend.set(f'key-{index}', f'text-{index}')
+        AIAsideContentCache.objects.update(accessed=timezone.now() - timedelta(hours=2))
+        backend.get('key-0')
+
+        backend.set('key-3', 'text-3')
+
+        remaining = set(AIAsideContentCache.objects.values_list('cache_key', flat=True))
+        self.assertEqual(remaining, {'key-0', 'key-3'})
+
+    @override_settings(SUMMARY_CONTENT_CACHE_MAX_ENTRIES=3, SUMMARY_CONTENT_CACHE_CULL_FREQUENCY=100)
+    def test_cull_only_checks_size_now_and_then(self):
+        backend = DatabaseBackend(60)
+        with patch('ai_aside.content_cache.random.randrange', return_value=1):
+            for index in range(5):
+                backend.set(f'key-{index}', f'text-{index}')
+        self.assertEqual(AIAsideContentCache.objects.count(), 5)
+
+        with patch('ai_aside.content_cache.random.randrange', return_value=0):
+            backend.set('key-5', 'text-5')
+        self.assertEqual(AIAsideContentCache.objects.count(), 2)
+
+    def test_recent_access_not_written(self):
+        backend = DatabaseBackend(60)
+        backend.set('the-key', 'Some text')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(backend.get('the-key'), (True, 'Some text', None))
+
+        AIAsideContentCache.objects.update(accessed=timezone.now() - timedelta(hours=2))
+        with self.assertNumQueries(2):
+            backend.get('the-key')
+
+
+class TestTranscriptCache(TestCase):
+    """Transcript cache tests"""
+    def test_key_changes_with_transcript_identity(self):
+        key = transcript_key(fake_video())
+
+        self.assertTrue(key.startswith('ai_aside.transcript.'))
+        self.assertEqual(key, transcript_key(fake_video()))
+        self.assertNotEqual(key, transcript_key(fake_video(edx_video_id='other-video-id')))
+        self.assertNotEqual(key, transcript_key(fake_video(transcripts={'en': 'other.srt'})))
+        self.assertNotEqual(key, transcript_key(fake_video(sub='other-sub')))
+
+        video = fake_video()
+        video.scope_ids.usage_id = None
+        self.assertIsNone(transcript_key(video))
+
+    def test_get_cached_transcript(self):
+        fetch = Mock(return_value='Some transcript')
+        contents = ('Some transcript', content_hash('Some transcript'))
+
+        self.assertEqual(get_cached_transcript(fake_video(), fetch), contents)
+        self.assertEqual(get_cached_transcript(fake_video(), fetch), contents)
+        fetch.assert_called_once()
+
+        self.assertEqual(get_cached_transcript(fake_video(transcripts={'en': 'new.srt'}), fetch), contents)
+        self.assertEqual(fetch.call_count, 2)
+
+        # transcripts are not kept with the contents
+        self.assertEqual(AIAsideContentCache.objects.count(), 0)
+
+    def test_get_cached_transcript_missing(self):
+        fetch = Mock(return_value=None)
+
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.assertEqual(get_cached_transcript(fake_video(), fetch), (None, None))
+
+        self.assertEqual(lookup_transcript(fake_video()), (True, None, None))
+        self.assertEqual(get_cached_transcript(fake_video(), fetch), (None, None))
+        fetch.assert_called_once()
+        self.assertEqual(cache_set.call_args.args[2], 60 * 60)
+
+    def test_get_cached_transcript_uncacheable(self):
+        video = fake_video()
+        video.scope_ids.usage_id = None
+        fetch = Mock(return_value='Some transcript')
+
+        get_cached_transcript(video, fetch)
+        get_cached_transcript(video, fetch)
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(lookup_transcript(video), (False, None, None))
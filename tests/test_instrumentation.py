@@ -0,0 +1,116 @@
+"""Tests for the timing of the summary aside phases"""
+import threading
+from contextlib import nullcontext
+from unittest.mock import MagicMock, Mock, call, patch
+
+from django.test import TestCase, override_settings
+from edx_django_utils.cache import RequestCache
+from opaque_keys.edx.keys import CourseKey
+
+from ai_aside.block import SummaryHookAside, _parse_children_contents
+from ai_aside.instrumentation import CustomAttributeBackend, timed
+from test_utils.blocks import fake_get_text_transcript, make_vertical
+from test_utils.instrumentation import RecordingBackend
+
+course_key = CourseKey.from_string('course-v1:edX+A+B')
+
+
+@override_settings(SUMMARY_INSTRUMENTATION_BACKENDS=['test_utils.instrumentation.RecordingBackend'])
+class TestTimed(TestCase):
+    """Phase timing tests"""
+    def setUp(self):
+        RecordingBackend.records = []
+
+    @override_settings(SUMMARY_INSTRUMENTATION_BACKENDS=[])
+    def test_disabled(self):
+        timer = timed('phase')
+
+        self.assertIsInstance(timer, nullcontext)
+        self.assertIs(timer, timed('other'))
+        with timer:
+            pass
+        self.assertEqual(RecordingBackend.records, [])
+
+    def test_records(self):
+        with timed('phase'):
+            pass
+
+        self.assertEqual(RecordingBackend.phases(), ['phase'])
+        self.assertGreaterEqual(RecordingBackend.records[0][1], 0)
+
+    def test_records_on_exception(self):
+        with self.assertRaises(ValueError):
+            with timed('phase'):
+                raise ValueError
+
+        self.assertEqual(RecordingBackend.phases(), ['phase'])
+
+    @override_settings(SUMMARY_HOOK_MIN_SIZE=40, HTML_TAGS_TO_REMOVE=[])
+    @patch('ai_aside.block.get_text_transcript', Mock(side_effect=fake_get_text_transcript))
+    def test_parse_children_contents_phases(self):
+        block = make_vertical(html_children=2, videos=1)
+
+        _parse_children_contents(block)
+
+        self.assertEqual(RecordingBackend.phases(), [
+            'child_fetch',
+            'child_fetch', 'html_to_text',
+            'child_fetch', 'html_to_text',
+            'transcript',
+        ])
+
+    @override_settings(SUMMARY_HOOK_MIN_SIZE=40, HTML_TAGS_TO_REMOVE=[], SUMMARY_CHILD_CONTENT_WORKERS=2)
+    @patch('ai_aside.block.get_text_transcript', Mock(side_effect=fake_get_text_transcript))
+    def test_pooled_transcripts_timed_in_request_thread(self):
+        block = make_vertical(videos=2)
+        threads = []
+
+        def record(phase, _seconds):
+            threads.append((phase, threading.current_thread()))
+
+        with patch.object(RecordingBackend, 'record', Mock(side_effect=record)):
+            _parse_children_contents(block)
+
+        request_thread = threading.current_thread()
+        self.assertEqual(threads, [
+            ('child_fetch', request_thread),
+            ('transcript', request_thread),
+            ('transcript', request_thread),
+        ])
+
+    @patch('ai_aside.block.is_summary_enabled', Mock(return_value=False))
+    @patch('ai_aside.block.ff_is_summary_config_enabled', Mock(return_value=True))
+    @patch('ai_aside.block.ff_summary_staff_only', Mock(return_value=False))
+    def test_should_apply_to_block_phases(self):
+        block = MagicMock(category='vertical')
+        block.scope_ids.usage_id = course_key.make_usage_key('vertical', 'unit')
+        block.runtime.user_is_staff = True
+
+        self.assertFalse(SummaryHookAside.should_apply_to_block(block))
+        self.assertEqual(RecordingBackend.phases(), ['flags', 'flags', 'enablement'])
+
+
+class TestCustomAttributeBackend(TestCase):
+    """New Relic custom attribute backend tests"""
+    def setUp(self):
+        RequestCache.clear_all_namespaces()
+
+    @patch('ai_aside.instrumentation.set_custom_attribute')
+    def test_totals_per_request(self, set_custom_attribute):
+        backend = CustomAttributeBackend()
+
+        backend.record('render', 0.001)
+        backend.record('render', 0.002)
+
+        set_custom_attribute.assert_has_calls([
+            call('ai_aside.render.count', 2),
+            call('ai_aside.render.ms', 3.0),
+        ])
+
+        RequestCache.clear_all_namespaces()
+        backend.record('render', 0.004)
+
+        set_custom_attribute.assert_has_calls([
+            call('ai_aside.render.count', 1),
+            call('ai_aside.render.ms', 4.0),
+        ])
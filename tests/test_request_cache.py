@@ -0,0 +1,66 @@
+"""Tests for request-scoped memoization"""
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+from edx_django_utils.cache import RequestCache
+from opaque_keys.edx.keys import CourseKey
+
+from ai_aside.request_cache import request_cache_stats, request_cached
+from ai_aside.waffle import summaries_configuration_enabled, summary_staff_only
+
+course_key = CourseKey.from_string('course-v1:edX+DemoX+Demo_Course')
+
+
+class TestRequestCached(TestCase):
+    """Request cache decorator tests"""
+    def test_memoized_per_arguments(self):
+        func = Mock(side_effect=lambda a, b=None: (a, b), __name__='func')
+        cached = request_cached('test.namespace')(func)
+
+        self.assertEqual(cached(1), (1, None))
+        self.assertEqual(cached(1), (1, None))
+        self.assertEqual(cached(1, b=2), (1, 2))
+        self.assertEqual(cached(2), (2, None))
+
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(request_cache_stats('test.namespace'), {'hits': 1, 'misses': 3})
+
+    def test_clear(self):
+        func = Mock(return_value=True, __name__='func')
+        cached = request_cached('test.namespace')(func)
+
+        cached()
+        cached.clear()
+        cached()
+
+        self.assertEqual(func.call_count, 2)
+
+    def test_new_request(self):
+        func = Mock(return_value=True, __name__='func')
+        cached = request_cached('test.namespace')(func)
+
+        cached()
+        RequestCache.clear_all_namespaces()
+        cached()
+
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(request_cache_stats('test.namespace'), {'hits': 0, 'misses': 1})
+
+    def test_shared_namespace(self):
+        first = request_cached('test.namespace')(Mock(return_value=1, __name__='first'))
+        second = request_cached('test.namespace')(Mock(return_value=2, __name__='second'))
+
+        self.assertEqual((first(), second()), (1, 2))
+
+    def test_waffle_flags_evaluated_once(self):
+        flag_class = Mock()
+        flag_class.return_value.is_enabled.return_value = True
+        waffle_utils = Mock(CourseWaffleFlag=flag_class)
+
+        with patch.dict('sys.modules', {'openedx.core.djangoapps.waffle_utils': waffle_utils}):
+            for _ in range(3):
+                self.assertTrue(summaries_configuration_enabled(course_key))
+                self.assertTrue(summary_staff_only(course_key))
+
+        self.assertEqual(flag_class.call_count, 2)
+        self.assertEqual(request_cache_stats('ai_aside.waffle'), {'hits': 4, 'misses': 2})
@@ -0,0 +1,68 @@
+"""Tests for the streamed JSON responses."""
+import gzip
+import json
+import zlib
+
+from django.test import TestCase
+from webob import Request
+
+from ai_aside.streaming import (
+    encoded_etag,
+    iter_compressed,
+    iter_json_object,
+    negotiate_encoding,
+    streamed_json_response,
+)
+
+
+class TestStreaming(TestCase):
+    """Streamed JSON tests"""
+    def test_iter_json_object(self):
+        fields = {'content_id': 'unit', 'edited_on': None}
+        items = [{'content_text': 'Some "quoted" text'}, {'content_text': 'Café'}]
+
+        chunks = list(iter_json_object(fields, 'data', iter(items)))
+
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(json.loads(b''.join(chunks)), {**fields, 'data': items})
+
+    def test_encoded_etag(self):
+        self.assertEqual(encoded_etag('the-etag', 'gzip'), 'the-etag-gzip')
+        self.assertEqual(encoded_etag('the-etag', None), 'the-etag')
+        self.assertIsNone(encoded_etag(None, 'gzip'))
+
+    def test_iter_json_object_empty(self):
+        self.assertEqual(json.loads(b''.join(iter_json_object({}, 'data', []))), {'data': []})
+
+    def test_iter_compressed(self):
+        chunks = [b'{"data":[', b'"a"', b',"b"', b']}']
+
+        self.assertEqual(list(iter_compressed(iter(chunks), None)), chunks)
+        self.assertEqual(gzip.decompress(b''.join(iter_compressed(iter(chunks), 'gzip'))), b''.join(chunks))
+        self.assertEqual(zlib.decompress(b''.join(iter_compressed(iter(chunks), 'deflate'))), b''.join(chunks))
+
+    def test_negotiate_encoding(self):
+        def encoding(accept_encoding):
+            return negotiate_encoding(Request.blank('/', headers={'Accept-Encoding': accept_encoding}))
+
+        self.assertIsNone(negotiate_encoding(None))
+        self.assertIsNone(negotiate_encoding(Request.blank('/')))
+        self.assertEqual(encoding('gzip, deflate, br'), 'gzip')
+        self.assertEqual(encoding('gzip;q=0.5, deflate'), 'deflate')
+        self.assertEqual(encoding('gzip;q=0'), None)
+        self.assertEqual(encoding('identity'), None)
+        self.assertEqual(encoding('*'), 'gzip')
+
+    def test_streamed_json_response(self):
+        request = Request.blank('/', headers={'Accept-Encoding': 'gzip'})
+        items = ({'index': index} for index in range(1000))
+
+        response = streamed_json_response(request, {'content_id': 'unit'}, 'data', items)
+
+        self.assertEqual(response.content_type, 'application/json')
+        self.assertEqual(response.content_encoding, 'gzip')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(json.loads(gzip.decompress(b''.join(response.app_iter))), {
+            'content_id': 'unit',
+            'data': [{'index': index} for index in range(1000)],
+        })
@@ -0,0 +1,202 @@
+"""Tests for the summary index."""
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytz
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from opaque_keys.edx.keys import CourseKey
+
+from ai_aside.indexing import index_course
+from ai_aside.models import AIAsideSummaryIndex
+from ai_aside.signals import connect_signals, handle_course_published
+from ai_aside.summary_index import get_unit_index, save_course_index
+from ai_aside.tasks import schedule_index_course
+from test_utils.blocks import FakeBlock, FakeChild, date1, date2
+
+course_key = CourseKey.from_string('course-v1:edX+A+B')
+unit_keys = [course_key.make_usage_key('vertical', f'vertical{index}') for index in range(3)]
+
+
+def make_child(category, test_id, html=''):
+    """Make a fake child published and edited on date1."""
+    return FakeChild(category, test_id, html, published_on=date1, edited_on=date1)
+
+
+def make_unit(unit_key, children):
+    """Make a fake unit published on date2."""
+    return FakeBlock(children, unit_key, published_on=date2)
+
+
+class TestSummaryIndex(TestCase):
+    """Summary index storage tests"""
+    def test_save_and_get(self):
+        save_course_index(course_key, {
+            unit_keys[0]: {'content_length': 100, 'item_count': 2, 'last_updated': date1},
+        })
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_unit_index(course_key, unit_keys[0]), {
+                'content_length': 100,
+                'item_count': 2,
+                'last_updated': date1,
+            })
+            self.assertIsNone(get_unit_index(course_key, unit_keys[1]))
+        self.assertIsNone(get_unit_index(CourseKey.from_string('course-v1:edX+A+C'), unit_keys[0]))
+
+    def test_save_updates_index(self):
+        save_course_index(course_key, {
+            unit_keys[0]: {'content_length': 100, 'item_count': 2, 'last_updated': date1},
+            unit_keys[1]: {'content_length': 10, 'item_count': 1, 'last_updated': date1},
+            unit_keys[2]: {'content_length': 20, 'item_count': 1, 'last_updated': date1},
+        })
+        self.assertIsNotNone(get_unit_index(course_key, unit_keys[1]))
+
+        save_course_index(course_key, {
+            unit_keys[0]: {'content_length': 200, 'item_count': 3, 'last_updated': date2},
+        }, removed_unit_keys=[unit_keys[1]])
+
+        self.assertEqual(get_unit_index(course_key, unit_keys[0])['content_length'], 200)
+        self.assertIsNone(get_unit_index(course_key, unit_keys[1]))
+        self.assertEqual(get_unit_index(course_key, unit_keys[2])['content_length'], 20)
+        self.assertEqual(AIAsideSummaryIndex.objects.count(), 2)
+
+
+@override_settings(SUMMARY_HOOK_MIN_SIZE=40, HTML_TAGS_TO_REMOVE=['script', 'style'])
+class TestIndexCourse(TestCase):
+    """Summary index building tests"""
+    def test_index_course(self):
+        units = [
+            make_unit(unit_keys[0], [
+                make_child('html', '01', '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>'),
+                make_child('problem', '02'),
+            ]),
+            make_unit(unit_keys[1], [make_child('problem', '03')]),
+        ]
+        broken = make_unit(unit_keys[2], [])
+        broken.get_children = Mock(side_effect=ValueError('broken'))
+        units.append(broken)
+
+        with patch('ai_aside.indexing.get_course_units', Mock(return_value=units)):
+            self.assertEqual(index_course(course_key), 2)
+
+        self.assertEqual(get_unit_index(course_key, unit_keys[0]), {
+            'content_length': 56,
+            'item_count': 1,
+            'last_updated': date2,
+        })
+        self.assertEqual(get_unit_index(course_key, unit_keys[1]), {
+            'content_length': 0,
+            'item_count': 0,
+            'last_updated': date2,
+        })
+        self.assertIsNone(get_unit_index(course_key, unit_keys[2]))
+
+    def test_index_course_incrementally(self):
+        children = [
+            make_child('html', '01', '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>'),
+            make_child('html', '02', '<p>Sed volutpat velit sed dui fringilla fermentum.</p>'),
+        ]
+        units = [make_unit(unit_keys[0], [children[0]]), make_unit(unit_keys[1], [children[1]])]
+        for child in children:
+            child.get_html = Mock(return_value=child.html)
+
+        with patch('ai_aside.indexing.get_course_units', Mock(return_value=units)):
+            self.assertEqual(index_course(course_key), 2)
+
+            # nothing changed
+            with self.assertNumQueries(1):
+                self.assertEqual(index_course(course_key), 0)
+
+            # one child edited and the other unit published again
+            children[0].edited_on = date2
+            children[0].html = '<p>Lorem ipsum dolor sit amet, sed do eiusmod tempor.</p>'
+            children[0].get_html.return_value = children[0].html
+            units[1].published_on = datetime(2023, 7, 1, tzinfo=pytz.UTC)
+            self.assertEqual(index_course(course_key), 1)
+
+        self.assertEqual(children[0].get_html.call_count, 2)
+        self.assertEqual(children[1].get_html.call_count, 1)
+        self.assertEqual(get_unit_index(course_key, unit_keys[0])['content_length'], 50)
+        self.assertEqual(get_unit_index(course_key, unit_keys[1])['last_updated'], units[1].published_on)
+
+        with patch('ai_aside.indexing.get_course_units', Mock(return_value=units[1:])):
+            self.assertEqual(index_course(course_key), 0)
+        self.assertIsNone(get_unit_index(course_key, unit_keys[0]))
+
+    def test_index_course_reextracts_not_summarizable(self):
+        video = make_child('video', '01')
+        units = [make_unit(unit_keys[0], [video])]
+        transcript = Mock(return_value=None)
+
+        with patch('ai_aside.indexing.get_course_units', Mock(return_value=units)), \
+                patch('ai_aside.block.get_text_transcript', transcript):
+            self.assertEqual(index_course(course_key), 1)
+            self.assertEqual(get_unit_index(course_key, unit_keys[0])['item_count'], 0)
+
+            # extracted again, but still without a transcript so nothing is written
+            with self.assertNumQueries(1):
+                self.assertEqual(index_course(course_key), 1)
+
+            # a transcript reaching edxval later edits no block, it is seen once the missing one expires
+            cache.clear()
+            transcript.return_value = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit.'
+            self.assertEqual(index_course(course_key), 1)
+            self.assertEqual(get_unit_index(course_key, unit_keys[0])['item_count'], 1)
+
+            # summarizable units are kept until their children change
+            self.assertEqual(index_course(course_key), 0)
+            video.edx_video_id = 'new-video-id'
+            self.assertEqual(index_course(course_key), 1)
+
+    def test_index_course_keeps_not_summarizable_without_videos(self):
+        units = [
+            make_unit(course_key.make_usage_key('vertical', f'problems{index}'), [make_child('problem', f'p{index}')])
+            for index in range(50)
+        ]
+        units.append(make_unit(unit_keys[0], [make_child('html', 'short', '<p>Short</p>')]))
+
+        with patch('ai_aside.indexing.get_course_units', Mock(return_value=units)):
+            self.assertEqual(index_course(course_key), 51)
+
+            # a publish that changes nothing writes nothing
+            with self.assertNumQueries(1):
+                self.assertEqual(index_course(course_key), 0)
+
+    @patch('ai_aside.signals.schedule_index_course')
+    def test_handle_course_published(self, mock_index_course):
+        handle_course_published(None, course_key=course_key)
+        mock_index_course.assert_not_called()
+
+        with override_settings(SUMMARY_INDEX_ENABLED=True):
+            handle_course_published(None, course_key=course_key)
+        mock_index_course.assert_called_once_with(course_key)
+
+    @patch('ai_aside.tasks.index_course')
+    def test_schedule_index_course(self, mock_index_course):
+        task = Mock()
+
+        with patch('ai_aside.tasks.index_course_task', task):
+            schedule_index_course(course_key)
+            task.delay.assert_called_once_with('course-v1:edX+A+B')
+            mock_index_course.assert_not_called()
+
+            with override_settings(SUMMARY_INDEX_ASYNC=False):
+                schedule_index_course(course_key)
+            mock_index_course.assert_called_once_with(course_key)
+
+        with patch('ai_aside.tasks.index_course_task', None):
+            schedule_index_course(course_key)
+        self.assertEqual(mock_index_course.call_count, 2)
+
+    def test_connect_signals(self):
+        signal = Mock()
+
+        with patch('ai_aside.signals.get_course_published_signal', Mock(return_value=signal)):
+            connect_signals()
+        signal.connect.assert_called_once_with(
+            handle_course_published, dispatch_uid='ai_aside.signals.handle_course_published',
+        )
+
+        with patch('ai_aside.signals.get_course_published_signal', Mock(side_effect=ImportError)):
+            connect_signals()
@@ -1,8 +1,12 @@
 """Tests for text utils used by the blocks"""
+import random
 import unittest
 from textwrap import dedent
 
-from ai_aside.text_utils import html_to_text
+from django.test import override_settings
+
+from ai_aside.text_utils import _WhitespaceNormalizer, cleanup_text, html_to_text
+from test_utils.text import html_chunks, realistic_html, regex_cleanup_text
 
 
 class TestSummaryHookAside(unittest.TestCase):
@@ -52,6 +56,88 @@ class TestSummaryHookAside(unittest.TestCase):
         text = html_to_text(html_content)
         self.assertEqual(text, expected_text)
 
+    @override_settings(HTML_TAGS_TO_REMOVE=['script', 'style'])
+    def test_html_to_text_removed_tags(self):
+        html_content = '''\
+            <p>Lorem ipsum</p>
+            <script>var dolor = "sit amet";</script> consectetur adipiscing elit.
+            <div><style>p { color: red; }</style>Sed volutpat velit.</div>'''
+        expected_text = dedent('''\
+            Lorem ipsum
+            consectetur adipiscing elit.
+            Sed volutpat velit.''')
+        text = html_to_text(html_content)
+        self.assertEqual(text, expected_text)
+
+    @override_settings(HTML_TAGS_TO_REMOVE=['aside', 'br'])
+    def test_html_to_text_nested_removed_tags(self):
+        html_content = '''\
+            <p>Lorem<br> ipsum</p>
+            <aside>Dolor <aside>sit</aside> amet<br/></aside>
+            <p>Consectetur <aside>adipiscing</aside> elit.</p>'''
+        expected_text = dedent('''\
+            Lorem ipsum
+            Consectetur elit.''')
+        text = html_to_text(html_content)
+        self.assertEqual(text, expected_text)
+
+    def test_html_to_text_tags_to_remove_setting_changed(self):
+        html_content = '<p>Lorem <em>ipsum</em> dolor</p>'
+
+        with override_settings(HTML_TAGS_TO_REMOVE=['em']):
+            self.assertEqual(html_to_text(html_content), 'Lorem dolor')
+        with override_settings(HTML_TAGS_TO_REMOVE=['EM', 'p']):
+            self.assertEqual(html_to_text(html_content), '')
+        with override_settings(HTML_TAGS_TO_REMOVE=None):
+            self.assertEqual(html_to_text(html_content), 'Lorem ipsum dolor')
+
+
+class TestCleanupText(unittest.TestCase):
+    """Tests of cleanup_text and the normalizer behind it, against the regular expressions they replaced"""
+    alphabet = ['a', 'b', '.', ' ', ' ', '\n', '\r', '\t', '\f', '\x0b', '\x1c', '\x85', '\xa0', '\u2028', '\u3000']
+
+    def normalize(self, chunks):
+        normalizer = _WhitespaceNormalizer()
+        for chunk in chunks:
+            normalizer.feed(chunk)
+        return normalizer.get_text()
+
+    def test_same_as_regex_cleanup(self):
+        rng = random.Random(7)
+        for _ in range(20000):
+            text = ''.join(rng.choice(self.alphabet) for _ in range(rng.randint(0, 20)))
+            self.assertEqual(cleanup_text(text), regex_cleanup_text(text), repr(text))
+
+    def test_same_as_regex_cleanup_long_text(self):
+        rng = random.Random(11)
+        words = self.alphabet + ['lorem', 'ipsum', '  ', '\n\n', ' \r\n ']
+        for _ in range(50):
+            text = ''.join(rng.choice(words) for _ in range(rng.randint(100, 2000)))
+            self.assertEqual(cleanup_text(text), regex_cleanup_text(text))
+
+    def test_chunked_same_as_whole(self):
+        rng = random.Random(42)
+        for _ in range(5000):
+            chunks = [
+                ''.join(rng.choice(self.alphabet) for _ in range(rng.randint(0, 8)))
+                for _ in range(rng.randint(0, 6))
+            ]
+            self.assertEqual(self.normalize(chunks), cleanup_text(''.join(chunks)), chunks)
+
+    def test_runs_across_chunks(self):
+        chunks = ['  Lorem ', '  ', '\n ipsum', ' \r', ' dolor  ', '\n ']
+        self.assertEqual(self.normalize(chunks), 'Lorem\nipsum \r dolor')
+
+    def test_html_to_text_same_as_cleanup_text(self):
+        html = realistic_html(paragraphs=3, rows=3)
+
+        self.assertEqual(html_to_text(html), cleanup_text(''.join(html_chunks(html))))
+
+    def test_cleanup_text(self):
+        self.assertEqual(cleanup_text(' \n Lorem  ipsum\t\n\n  dolor \r sit  \n '), 'Lorem ipsum\ndolor \r sit')
+        self.assertEqual(cleanup_text('Lorem  '), 'Lorem ')
+        self.assertEqual(cleanup_text(' \r\n '), '')
+
 
 if __name__ == '__main__':
     unittest.main()
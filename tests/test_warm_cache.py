@@ -0,0 +1,81 @@
+"""Tests for the ai_aside_warm_cache management command."""
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from opaque_keys.edx.keys import CourseKey
+
+from ai_aside.content_cache import child_content_key, lookup_child_contents
+from ai_aside.models import AIAsideCourseEnabled
+from test_utils.blocks import FakeBlock, FakeChild
+
+course_keys = [
+    CourseKey.from_string('course-v1:edX+DemoX+Demo_Course'),
+    CourseKey.from_string('course-v1:edX+DemoX+Demo_Course-2'),
+]
+lorem_html = '<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>'
+
+
+@override_settings(
+    SUMMARY_HOOK_MIN_SIZE=40,
+    HTML_TAGS_TO_REMOVE=['script', 'style'],
+    SUMMARY_CONTENT_CACHE_BACKENDS=['ai_aside.content_cache.DjangoCacheBackend'],
+)
+class TestWarmCacheCommand(TestCase):
+    """ai_aside_warm_cache tests"""
+    def setUp(self):
+        self.children = {course_key: [FakeChild('html', f'{index}-{unit}', lorem_html) for unit in range(3)]
+                         for index, course_key in enumerate(course_keys)}
+        self.units = {
+            course_key: [
+                FakeBlock([child], course_key.make_usage_key('vertical', f'vertical{index}'))
+                for index, child in enumerate(children)
+            ]
+            for course_key, children in self.children.items()
+        }
+        self.broken = FakeBlock([], course_keys[1].make_usage_key('vertical', 'verticalbroken'))
+        self.broken.get_children = Mock(side_effect=ValueError('broken'))
+        self.units[course_keys[1]].append(self.broken)
+
+        self.units_mock = patch(
+            'ai_aside.management.commands.ai_aside_warm_cache.get_course_units',
+            Mock(side_effect=lambda course_key: self.units[course_key]),
+        )
+        self.units_mock.start()
+
+    def tearDown(self):
+        self.units_mock.stop()
+
+    def test_warm_course(self):
+        out = StringIO()
+
+        call_command('ai_aside_warm_cache', '--course', str(course_keys[0]), stdout=out)
+
+        for child in self.children[course_keys[0]]:
+            self.assertEqual(lookup_child_contents(child)[0], True, child_content_key(child))
+        for child in self.children[course_keys[1]]:
+            self.assertEqual(lookup_child_contents(child), (False, None, None))
+        self.assertIn(f'{course_keys[0]}: warmed 3 units, 0 failed', out.getvalue())
+        self.assertIn('Warmed 3 units of 1 courses', out.getvalue())
+
+    def test_warm_all_enabled(self):
+        AIAsideCourseEnabled.objects.create(course_key=course_keys[1], enabled=True)
+        AIAsideCourseEnabled.objects.create(course_key=CourseKey.from_string('course-v1:edX+A+B'), enabled=False)
+        out = StringIO()
+
+        call_command('ai_aside_warm_cache', '--all-enabled', '--workers', '2', stdout=out)
+
+        for child in self.children[course_keys[1]]:
+            self.assertEqual(lookup_child_contents(child)[0], True)
+        self.assertIn(f'{course_keys[1]}: warmed 3 units, 1 failed', out.getvalue())
+        self.assertIn('Warmed 3 units of 1 courses', out.getvalue())
+
+    def test_invalid_arguments(self):
+        with self.assertRaisesRegex(CommandError, 'at least one'):
+            call_command('ai_aside_warm_cache')
+        with self.assertRaisesRegex(CommandError, 'not a valid CourseKey'):
+            call_command('ai_aside_warm_cache', '--course', 'not-a-course')
+        with self.assertRaisesRegex(CommandError, '--workers'):
+            call_command('ai_aside_warm_cache', '--course', str(course_keys[0]), '--workers', '0')